@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -8,6 +9,8 @@ class Settings(BaseSettings):
     ALGORITHM: str
 
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DATABASE_REPLICA_URLS: str = ""
     REDIS_URL: str
 
     SUPERUSER_EMAIL: str
@@ -21,6 +24,9 @@ class Settings(BaseSettings):
     MAIL_PORT: int
     MAIL_STARTTLS: bool
     MAIL_SSL_TLS: bool
+    MAIL_POOL_SIZE: int = 4
+    MAIL_POOL_IDLE_SECONDS: int = 60
+    MAIL_MAX_RETRIES: int = 5
 
     CORS_ORIGINS: str
 
@@ -34,7 +40,52 @@ class Settings(BaseSettings):
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
 
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_PGBOUNCER: bool = False
+    DB_REPLICA_MAX_LAG_SECONDS: float = 1.0
+
+    BOOKING_HOLD_MINUTES: int = 2
+    BOOKING_CLEANUP_BATCH_SIZE: int = 500
+    BOOKING_EXPIRY_GRACE_SECONDS: int = 1
+
+    CACHE_LOCAL_MAX_ITEMS: int = 1024
+    CACHE_LOCAL_TTL_SECONDS: int = 10
+
+    # True: quyền/trạng thái lấy từ claim của JWT + danh sách thu hồi, không query User mỗi request
+    AUTH_STATELESS: bool = True
+    AUTH_REVOCATION_CACHE_SECONDS: int = 5
+    # 2 request refresh song song cùng 1 token: token vừa bị xoay vẫn được chấp nhận trong khoảng này
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
+
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 5.0
+    LOGIN_MAX_CONCURRENT_PER_ACCOUNT: int = 2
+    LOGIN_MAX_CONCURRENT_PER_IP: int = 8
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
+    @staticmethod
+    def _to_async_url(url: str) -> str:
+        if url.startswith("postgresql://"):
+            return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+        return url.replace("+psycopg2", "+asyncpg", 1)
+
+    @property
+    def async_database_url(self) -> str:
+        return self.ASYNC_DATABASE_URL or self._to_async_url(self.DATABASE_URL)
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [u.strip() for u in self.DATABASE_REPLICA_URLS.split(",") if u.strip()]
+
+    @property
+    def async_replica_urls(self) -> list[str]:
+        return [self._to_async_url(u) for u in self.replica_urls]
+
 
 settings = Settings()
@@ -1,15 +1,186 @@
+import time
+import uuid
+import threading
+from itertools import cycle
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, NullPool
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    pool_pre_ping=True
+
+class PoolMetrics:
+    """Thời gian chờ lấy connection từ pool (checkout wait), để chỉnh pool size."""
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(self.BUCKETS) + 1)
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"le_{b}" for b in self.BUCKETS] + ["le_inf"]
+            return {
+                "checkouts": self.count,
+                "wait_avg_ms": round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+                "wait_max_ms": round(self.max_seconds * 1000, 3),
+                "wait_buckets": dict(zip(labels, self.buckets)),
+            }
+
+
+pool_metrics: dict = {}
+
+
+class TimedQueuePool(QueuePool):
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics:
+                self.metrics.observe(time.perf_counter() - start)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.metrics:
+                self.metrics.observe(time.perf_counter() - start)
+
+
+def _pool_kwargs(name: str, pool_class) -> dict:
+    # PgBouncer (transaction pooling) tự giữ pool, app không giữ connection
+    if settings.DB_PGBOUNCER:
+        return {"poolclass": NullPool}
+
+    metrics = pool_metrics.setdefault(name, PoolMetrics())
+    # gắn metrics vào class (không phải instance) để vẫn giữ sau pool.recreate()
+    timed_pool = type(pool_class.__name__, (pool_class,), {"metrics": metrics})
+    return {
+        "poolclass": timed_pool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def _make_engine(url: str, name: str):
+    return create_engine(
+        url,
+        echo=False,
+        pool_pre_ping=True,
+        **_pool_kwargs(name, TimedQueuePool)
+    )
+
+
+def _make_async_engine(url: str, name: str):
+    connect_args = {}
+    if settings.DB_PGBOUNCER:
+        # PgBouncer transaction mode không giữ prepared statement giữa các transaction
+        connect_args = {
+            "statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+
+    return create_async_engine(
+        url,
+        echo=False,
+        pool_pre_ping=True,
+        connect_args=connect_args,
+        **_pool_kwargs(name, TimedAsyncQueuePool)
+    )
+
+
+# Engine sync: Celery worker, script và các router chưa chuyển sang async
+engine = _make_engine(settings.DATABASE_URL, "primary")
+
+# Engine async (asyncpg) cho các router async
+async_engine = _make_async_engine(settings.async_database_url, "async_primary")
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
 )
 
+
+# Replica chỉ đọc; không cấu hình thì đọc từ primary
+read_engines = [
+    _make_engine(url, f"replica_{i}")
+    for i, url in enumerate(settings.replica_urls)
+] or [engine]
+
+async_read_engines = [
+    _make_async_engine(url, f"async_replica_{i}")
+    for i, url in enumerate(settings.async_replica_urls)
+] or [async_engine]
+
+_next_read_engine = cycle(read_engines)
+_next_async_read_sessionmaker = cycle([
+    async_sessionmaker(e, class_=AsyncSession, expire_on_commit=False)
+    for e in async_read_engines
+])
+
+
 def init_db() -> None:
     SQLModel.metadata.create_all(engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+def get_read_session():
+    """Session cho endpoint chỉ đọc, xoay vòng giữa các replica."""
+    with Session(next(_next_read_engine)) as session:
+        yield session
+
+async def get_async_session():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def get_async_read_session():
+    async with next(_next_async_read_sessionmaker)() as session:
+        yield session
+
+
+def pool_stats() -> dict:
+    engines = {"primary": engine, "async_primary": async_engine.sync_engine}
+    for i, e in enumerate(read_engines):
+        if e is not engine:
+            engines[f"replica_{i}"] = e
+    for i, e in enumerate(async_read_engines):
+        if e is not async_engine:
+            engines[f"async_replica_{i}"] = e.sync_engine
+
+    stats = {}
+    for name, e in engines.items():
+        stats[name] = {
+            "status": e.pool.status(),
+            **(pool_metrics[name].snapshot() if name in pool_metrics else {}),
+        }
+    return stats
@@ -4,9 +4,11 @@ from sqlmodel import Session, select
 
 from app.core.config import settings
 from app.core.database import init_db, engine
+from app.utils.cache_invalidation import register_cache_invalidation
+from app.utils.token_revocation import register_token_revocation
 
 
-from app.utils.security import hash_password
+from app.utils.security import hash_password, shutdown_password_pool
 from app.utils.enums import UserRole
 
 
@@ -23,11 +25,15 @@ from app.routers.property_search import router as property_search_router
 from app.routers.room import router as rooms_router
 from app.routers.property import router as property_router
 from app.routers.review import router as review_router
+from app.routers.metrics import router as metrics_router
 
 
 def create_app() -> FastAPI:
     app = FastAPI(title=settings.PROJECT_NAME)
 
+    register_cache_invalidation()
+    register_token_revocation()
+
 
     cors_origins = [
         o.strip()
@@ -64,6 +70,7 @@ def create_app() -> FastAPI:
     app.include_router(rooms_router)
     app.include_router(property_router)
     app.include_router(review_router)
+    app.include_router(metrics_router)
 
 
 
@@ -100,6 +107,10 @@ def create_app() -> FastAPI:
                 session.commit()
                 print("🎉 Super admin created successfully!")
 
+    @app.on_event("shutdown")
+    def on_shutdown() -> None:
+        shutdown_password_pool()
+
     return app
 
 
@@ -8,3 +8,5 @@ from .amenity import Amenity
 from .property_amenity import PropertyAmenity
 from .booked_room import BookedRoom
 from .payment import Payment
+from .room_type_inventory import RoomTypeInventory
+from .property_rating_stats import PropertyRatingStats
@@ -1,5 +1,6 @@
 from typing import Optional, TYPE_CHECKING
 from datetime import date
+from sqlalchemy import func, literal_column
 from sqlmodel import SQLModel, Field, Relationship
 
 if TYPE_CHECKING:
@@ -7,6 +8,15 @@ if TYPE_CHECKING:
     from .room import Room
 
 
+# Exclusion constraint (btree_gist) trong migration: 1 phòng không có 2 khoảng ở giao nhau
+NO_OVERLAP_CONSTRAINT = "ex_booked_room_no_overlap"
+
+
+def stay_range(checkin, checkout):
+    """daterange nửa mở [checkin, checkout) — phải viết giống hệt biểu thức trong index"""
+    return func.daterange(checkin, checkout, literal_column("'[)'"))
+
+
 class BookedRoom(SQLModel, table=True):
     __tablename__ = "booked_room"
 
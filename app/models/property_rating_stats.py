@@ -0,0 +1,18 @@
+from sqlmodel import SQLModel, Field
+
+
+class PropertyRatingStats(SQLModel, table=True):
+    """Tổng hợp review theo property, cập nhật cùng transaction với thêm/xóa review."""
+    __tablename__ = "property_rating_stats"
+
+    property_id: int = Field(foreign_key="property.id", primary_key=True)
+
+    review_count: int = 0
+    rating_sum: int = 0
+
+    # histogram số review theo số sao
+    count_1: int = 0
+    count_2: int = 0
+    count_3: int = 0
+    count_4: int = 0
+    count_5: int = 0
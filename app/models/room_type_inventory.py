@@ -0,0 +1,14 @@
+from datetime import date
+from sqlmodel import SQLModel, Field
+
+
+class RoomTypeInventory(SQLModel, table=True):
+    """Số phòng theo loại phòng theo từng đêm, cập nhật dần theo booking/thanh toán/hủy."""
+    __tablename__ = "room_type_inventory"
+
+    room_type_id: int = Field(foreign_key="room_type.id", primary_key=True)
+    night: date = Field(primary_key=True)
+
+    total: int = 0
+    booked: int = 0
+    held: int = 0
@@ -1,5 +1,6 @@
 # app/repositories/auth_repo.py
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.user import User
 
 
@@ -10,6 +11,16 @@ class AuthRepository:
         stmt = select(User).where(User.email == email)
         return session.exec(stmt).first()
 
+    async def get_user_by_email_async(self, session: AsyncSession, email: str):
+        stmt = select(User).where(User.email == email)
+        return (await session.exec(stmt)).first()
+
+    async def save_user_async(self, session: AsyncSession, user: User):
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
+        return user
+
     def get_user(self, session: Session, user_id: int):
         return session.get(User, user_id)
 
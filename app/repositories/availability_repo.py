@@ -0,0 +1,83 @@
+from datetime import date, datetime
+from typing import Iterable, List
+
+from sqlalchemy import Integer, cast, func
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.booked_room import BookedRoom, stay_range
+from app.models.booking import Booking
+from app.models.room import Room
+from app.utils.lock import get_held_room_ids
+
+
+class AvailabilityRepository:
+
+    @staticmethod
+    def _held_room_ids(checkin: date, checkout: date):
+        # room id của các booking pending còn hạn, giao với [checkin, checkout)
+        return (
+            select(cast(func.json_array_elements_text(Booking.selected_rooms), Integer))
+            .where(Booking.status == "pending")
+            .where(Booking.expires_at > datetime.utcnow())
+            .where(Booking.checkin < checkout)
+            .where(Booking.checkout > checkin)
+        )
+
+    @staticmethod
+    def _booked_conflict(checkin: date, checkout: date):
+        return (
+            select(BookedRoom.id)
+            .where(BookedRoom.room_id == Room.id)
+            .where(
+                stay_range(BookedRoom.checkin, BookedRoom.checkout)
+                .op("&&")(stay_range(checkin, checkout))
+            )
+            .exists()
+        )
+
+    @staticmethod
+    def get_available_rooms(
+        session: Session,
+        room_type_ids: Iterable[int],
+        checkin: date,
+        checkout: date,
+    ) -> List[Room]:
+        room_type_ids = list(room_type_ids)
+        if not room_type_ids:
+            return []
+
+        statement = (
+            select(Room)
+            .where(Room.room_type_id.in_(room_type_ids))
+            .where(Room.is_active == True)
+            .where(~AvailabilityRepository._booked_conflict(checkin, checkout))
+            .where(Room.id.not_in(AvailabilityRepository._held_room_ids(checkin, checkout)))
+            .order_by(Room.room_type_id, Room.id)
+        )
+        rooms = session.exec(statement).all()
+
+        # hold trong Redis có trước khi booking pending được commit
+        held = get_held_room_ids([room.id for room in rooms], checkin, checkout)
+        return [room for room in rooms if room.id not in held]
+
+    @staticmethod
+    async def get_unavailable_room_ids(
+        session: AsyncSession,
+        room_ids: Iterable[int],
+        checkin: date,
+        checkout: date,
+    ) -> List[int]:
+        room_ids = list(room_ids)
+        if not room_ids:
+            return []
+
+        available = (
+            select(Room.id)
+            .where(Room.id.in_(room_ids))
+            .where(Room.is_active == True)
+            .where(~AvailabilityRepository._booked_conflict(checkin, checkout))
+            .where(Room.id.not_in(AvailabilityRepository._held_room_ids(checkin, checkout)))
+        )
+        free = set((await session.exec(available)).all())
+        return [rid for rid in room_ids if rid not in free]
@@ -1,3 +1,5 @@
+from typing import Iterable, List
+from sqlalchemy import insert
 from sqlmodel import Session
 from app.models.booked_room import BookedRoom
 
@@ -12,7 +14,20 @@ class BookedRoomRepository:
             checkin=checkin,
             checkout=checkout
         )
+        # flush để exclusion constraint báo đụng ngay; caller commit cả booking 1 lần
         session.add(br)
-        session.commit()
-        session.refresh(br)
+        session.flush()
         return br
+
+    @staticmethod
+    def create_many(session: Session, booking_id: int, room_ids: Iterable[int], checkin, checkout) -> List[int]:
+        """1 câu INSERT nhiều dòng ... RETURNING id, không commit."""
+        rows = [
+            {"booking_id": booking_id, "room_id": rid, "checkin": checkin, "checkout": checkout}
+            for rid in room_ids
+        ]
+        if not rows:
+            return []
+
+        stmt = insert(BookedRoom).values(rows).returning(BookedRoom.id)
+        return list(session.exec(stmt).scalars().all())
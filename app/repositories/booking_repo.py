@@ -1,12 +1,23 @@
+from typing import Optional
+from sqlalchemy import update
 from sqlmodel import Session, select
-from datetime import datetime, timedelta
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime
 from app.models.booking import Booking
 
 
 class BookingRepository:
 
     @staticmethod
-    def create(session: Session, user_id: int, checkin, checkout, num_guests: int, selected_rooms: list):
+    async def create(
+        session: AsyncSession,
+        user_id: int,
+        checkin,
+        checkout,
+        num_guests: int,
+        selected_rooms: list,
+        expires_at: datetime,
+    ):
         booking = Booking(
             user_id=user_id,
             checkin=checkin,
@@ -14,15 +25,44 @@ class BookingRepository:
             num_guests=num_guests,
             selected_rooms=selected_rooms,
             status="pending",
-            expires_at=datetime.utcnow() + timedelta(minutes=2)  # ✅ 2 phút
+            expires_at=expires_at
         )
 
+        # chỉ flush để lấy id làm token giữ phòng; service commit sau khi giữ được phòng
         session.add(booking)
-        session.commit()
-        session.refresh(booking)
+        await session.flush()
         return booking
 
     @staticmethod
-    def get_by_user(session: Session, user_id: int):
+    async def get_by_user(session: AsyncSession, user_id: int):
         stmt = select(Booking).where(Booking.user_id == user_id)
+        result = await session.exec(stmt)
+        return result.all()
+
+    @staticmethod
+    def expire_pending(session: Session, now: datetime, limit: int, booking_id: Optional[int] = None):
+        """Hủy tối đa `limit` booking pending đã hết hạn trong 1 câu UPDATE ... RETURNING.
+
+        SKIP LOCKED: nhiều worker chạy song song sẽ lấy các lô khác nhau, và bỏ qua
+        booking đang bị khóa bởi confirm_payment. Không commit.
+        """
+        expired_ids = (
+            select(Booking.id)
+            .where(Booking.status == "pending")
+            .where(Booking.expires_at < now)
+            .order_by(Booking.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if booking_id is not None:
+            expired_ids = expired_ids.where(Booking.id == booking_id)
+        stmt = (
+            update(Booking)
+            .where(Booking.id.in_(expired_ids.scalar_subquery()))
+            .where(Booking.status == "pending")
+            .values(status="cancelled")
+            .returning(
+                Booking.id, Booking.selected_rooms, Booking.checkin, Booking.checkout, Booking.expires_at
+            )
+        )
         return session.exec(stmt).all()
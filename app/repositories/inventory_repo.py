@@ -0,0 +1,276 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Date, Integer, cast, func, literal, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.booked_room import BookedRoom
+from app.models.booking import Booking
+from app.models.room import Room
+from app.models.room_type import RoomType
+from app.models.room_type_inventory import RoomTypeInventory
+
+
+def _nights(checkin: date, checkout: date) -> List[date]:
+    return [checkin + timedelta(days=i) for i in range((checkout - checkin).days)]
+
+
+class InventoryRepository:
+
+    @staticmethod
+    def _room_types(room_ids: Iterable[int]):
+        return select(Room.id, Room.room_type_id).where(Room.id.in_(set(room_ids)))
+
+    @staticmethod
+    def _night_counts(
+        stays: List[Tuple[List[int], date, date]],
+        room_type_of: Dict[int, int],
+    ) -> Dict[Tuple[int, date], int]:
+        # số phòng theo (loại, đêm); gộp mọi booking trong lô thành 1 delta mỗi dòng inventory
+        counts = Counter()
+        for room_ids, checkin, checkout in stays:
+            for rid in room_ids:
+                if rid in room_type_of:
+                    for night in _nights(checkin, checkout):
+                        counts[(room_type_of[rid], night)] += 1
+        return counts
+
+    @staticmethod
+    def _totals(room_type_ids: Iterable[int]):
+        # đếm cả phòng đã tắt: booked/held cũng gồm booking trên các phòng đó
+        return (
+            select(Room.room_type_id, func.count(Room.id))
+            .where(Room.room_type_id.in_(list(room_type_ids)))
+            .group_by(Room.room_type_id)
+        )
+
+    @staticmethod
+    def _upsert(counts: Dict[Tuple[int, date], int], totals: Dict[int, int], booked: int, held: int):
+        rows = [
+            {
+                "room_type_id": rt_id,
+                "night": night,
+                "total": totals.get(rt_id, 0),
+                "booked": booked * n,
+                "held": held * n,
+            }
+            for (rt_id, night), n in sorted(counts.items())
+        ]
+        if not rows:
+            return None
+
+        stmt = insert(RoomTypeInventory).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=[RoomTypeInventory.room_type_id, RoomTypeInventory.night],
+            set_={
+                # total theo số phòng hiện tại, không giữ số cũ lúc tạo dòng
+                "total": stmt.excluded.total,
+                "booked": RoomTypeInventory.booked + stmt.excluded.booked,
+                "held": RoomTypeInventory.held + stmt.excluded.held,
+            },
+        )
+
+    @staticmethod
+    def adjust_many(
+        session: Session,
+        stays: Iterable[Tuple[Iterable[int], date, date]],
+        booked: int = 0,
+        held: int = 0,
+    ) -> None:
+        """Cộng booked/held (có thể âm) cho mỗi (room_ids, checkin, checkout), trong transaction
+        của caller: 3 statement cho cả lô, bất kể số booking."""
+        stays = [(list(room_ids), checkin, checkout) for room_ids, checkin, checkout in stays]
+        room_ids = {rid for ids, _, _ in stays for rid in ids}
+        if not room_ids:
+            return
+
+        room_type_of = dict(session.exec(InventoryRepository._room_types(room_ids)).all())
+        counts = InventoryRepository._night_counts(stays, room_type_of)
+        totals = dict(session.exec(InventoryRepository._totals({rt for rt, _ in counts})).all())
+        stmt = InventoryRepository._upsert(counts, totals, booked, held)
+        if stmt is not None:
+            session.exec(stmt)
+
+    @staticmethod
+    def adjust(
+        session: Session,
+        room_ids: Iterable[int],
+        checkin: date,
+        checkout: date,
+        booked: int = 0,
+        held: int = 0,
+    ) -> None:
+        """Cộng booked/held (có thể âm) cho mỗi đêm, trong transaction của caller."""
+        InventoryRepository.adjust_many(session, [(room_ids, checkin, checkout)], booked, held)
+
+    @staticmethod
+    async def adjust_async(
+        session: AsyncSession,
+        room_ids: Iterable[int],
+        checkin: date,
+        checkout: date,
+        booked: int = 0,
+        held: int = 0,
+    ) -> None:
+        room_ids = list(room_ids)
+        if not room_ids:
+            return
+
+        stays = [(room_ids, checkin, checkout)]
+        room_type_of = dict((await session.exec(InventoryRepository._room_types(room_ids))).all())
+        counts = InventoryRepository._night_counts(stays, room_type_of)
+        totals = dict((await session.exec(InventoryRepository._totals({rt for rt, _ in counts}))).all())
+        stmt = InventoryRepository._upsert(counts, totals, booked, held)
+        if stmt is not None:
+            await session.exec(stmt)
+
+    @staticmethod
+    def get_free_counts(
+        session: Session,
+        room_type_ids: Iterable[int],
+        checkin: date,
+        checkout: date,
+    ) -> Dict[int, int]:
+        """Cận trên số phòng còn trống của mỗi loại cho cả khoảng ngày.
+
+        = số phòng hiện tại (kể cả đã tắt) - max(booked + held) theo từng đêm. Hai vế cùng tính
+        cả phòng đã tắt nên 0 chắc chắn là hết phòng active; > 0 chưa chắc còn phòng active,
+        caller vẫn phải kiểm tra từng phòng. Đêm chưa có dòng nghĩa là chưa ai đặt/giữ.
+        """
+        room_type_ids = list(room_type_ids)
+        if not room_type_ids:
+            return {}
+
+        stmt = (
+            select(
+                RoomTypeInventory.room_type_id,
+                func.max(RoomTypeInventory.booked + RoomTypeInventory.held),
+            )
+            .where(RoomTypeInventory.room_type_id.in_(room_type_ids))
+            .where(RoomTypeInventory.night >= checkin)
+            .where(RoomTypeInventory.night < checkout)
+            .group_by(RoomTypeInventory.room_type_id)
+        )
+        used = dict(session.exec(stmt).all())
+        totals = dict(session.exec(InventoryRepository._totals(room_type_ids)).all())
+
+        return {
+            rt_id: max(totals.get(rt_id, 0) - used.get(rt_id, 0), 0)
+            for rt_id in room_type_ids
+        }
+
+    @staticmethod
+    def _expected_nights(room_type_id: int, since: date):
+        """(night, booked, held) tính lại từ booked_room và booking pending, từ đêm `since`."""
+        booked_stays = (
+            select(
+                BookedRoom.checkin,
+                BookedRoom.checkout,
+                literal(1).label("booked"),
+                literal(0).label("held"),
+            )
+            .join(Room, Room.id == BookedRoom.room_id)
+            .where(Room.room_type_id == room_type_id)
+            .where(BookedRoom.checkout > since)
+        )
+
+        held_rooms = (
+            select(
+                Booking.checkin,
+                Booking.checkout,
+                cast(func.json_array_elements_text(Booking.selected_rooms), Integer).label("room_id"),
+            )
+            .where(Booking.status == "pending")
+            .where(Booking.checkout > since)
+            .subquery()
+        )
+        held_stays = (
+            select(
+                held_rooms.c.checkin,
+                held_rooms.c.checkout,
+                literal(0).label("booked"),
+                literal(1).label("held"),
+            )
+            .join(Room, Room.id == held_rooms.c.room_id)
+            .where(Room.room_type_id == room_type_id)
+        )
+
+        stays = union_all(booked_stays, held_stays).subquery()
+        nights = select(
+            cast(
+                func.generate_series(
+                    func.greatest(stays.c.checkin, since),
+                    stays.c.checkout - 1,
+                    timedelta(days=1),
+                ),
+                Date,
+            ).label("night"),
+            stays.c.booked,
+            stays.c.held,
+        ).subquery()
+
+        return (
+            select(nights.c.night, func.sum(nights.c.booked), func.sum(nights.c.held))
+            .group_by(nights.c.night)
+        )
+
+    @staticmethod
+    def room_type_ids(session: Session) -> List[int]:
+        return list(session.exec(select(RoomType.id).order_by(RoomType.id)).all())
+
+    @staticmethod
+    def reconcile_room_type(session: Session, room_type_id: int, since: date) -> List[tuple]:
+        """Đối soát 1 loại phòng từ đêm `since`, chỉ ghi các đêm bị lệch. Không commit.
+
+        Không khóa cả bảng: khóa các dòng hiện có của loại phòng (cùng thứ tự night như adjust)
+        rồi mới tính lại, nên mọi thay đổi đã commit trước đó đều được thấy; upsert đến sau
+        phải chờ và cộng dồn lên số đã sửa. Dòng chưa có thì chèn kiểu DO NOTHING: nếu adjust
+        đồng thời vừa tạo dòng đó thì giữ số của nó, lần đối soát sau sẽ kiểm tra lại.
+        Trả về [(night, (total, booked, held) hiện tại, đúng)] của các đêm bị lệch.
+        """
+        current = {
+            night: (total, booked, held)
+            for night, total, booked, held in session.exec(
+                select(
+                    RoomTypeInventory.night,
+                    RoomTypeInventory.total,
+                    RoomTypeInventory.booked,
+                    RoomTypeInventory.held,
+                )
+                .where(RoomTypeInventory.room_type_id == room_type_id)
+                .where(RoomTypeInventory.night >= since)
+                .order_by(RoomTypeInventory.night)
+                .with_for_update()
+            ).all()
+        }
+        total = dict(session.exec(InventoryRepository._totals([room_type_id])).all()).get(room_type_id, 0)
+        expected = {
+            night: (total, int(booked), int(held))
+            for night, booked, held in session.exec(
+                InventoryRepository._expected_nights(room_type_id, since)
+            ).all()
+        }
+
+        drift, updates, inserts = [], [], []
+        for night in sorted(current.keys() | expected.keys()):
+            got, want = current.get(night), expected.get(night, (total, 0, 0))
+            if got == want or (got is None and want[1:] == (0, 0)):
+                continue
+            drift.append((night, got, want))
+            row = {
+                "room_type_id": room_type_id,
+                "night": night,
+                "total": want[0],
+                "booked": want[1],
+                "held": want[2],
+            }
+            (inserts if got is None else updates).append(row)
+
+        if updates:
+            session.execute(update(RoomTypeInventory), updates)
+        if inserts:
+            session.exec(insert(RoomTypeInventory).values(inserts).on_conflict_do_nothing())
+        return drift
@@ -1,5 +1,9 @@
+from typing import List, Optional
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.property import Property
+from app.models.room_type import RoomType
 
 
 class PropertyRepository:
@@ -10,6 +14,24 @@ class PropertyRepository:
         return session.exec(statement).first()
 
     @staticmethod
-    def get_all(session: Session):
-        stmt = select(Property).where(Property.is_active == True)
-        return session.exec(stmt).all()
\ No newline at end of file
+    async def get_detail(session: AsyncSession, property_id: int):
+        # 3 query cố định: property, room_type, room; review lấy riêng theo trang
+        statement = (
+            select(Property)
+            .where(Property.id == property_id)
+            .options(
+                selectinload(Property.room_types).selectinload(RoomType.rooms),
+            )
+        )
+        result = await session.exec(statement)
+        return result.first()
+
+    @staticmethod
+    def get_page(session: Session, fields: List[str], limit: int, cursor: Optional[int] = None):
+        # keyset theo id: trang sau chỉ cần id cuối của trang trước
+        columns = [getattr(Property, f) for f in fields]
+        stmt = select(*columns).where(Property.is_active == True)
+        if cursor is not None:
+            stmt = stmt.where(Property.id > cursor)
+        stmt = stmt.order_by(Property.id).limit(limit)
+        return session.exec(stmt).all()
@@ -1,22 +1,139 @@
 # app/repositories/property_search_repo.py
+from sqlalchemy import func, literal
 from sqlmodel import Session, select
 from app.models.property import Property
+from app.models.property_rating_stats import PropertyRatingStats
+from app.repositories.rating_stats_repo import average_rating
+
+
+def _unaccent(expr):
+    # f_unaccent: wrapper IMMUTABLE của unaccent, tạo trong migration 5e0b7c2a9d41
+    return func.f_unaccent(func.lower(expr))
+
+
+def _escape_like(keyword: str) -> str:
+    return keyword.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 class PropertySearchRepository:
 
     @staticmethod
-    def search_properties(session: Session, keyword: str):
-        pattern = f"%{keyword}%"
+    def search_properties(
+        session: Session,
+        keyword: str,
+        limit: int = 20,
+        offset: int = 0,
+        sort: str = "relevance",
+    ):
+        keyword = keyword.strip()
+
+        name_expr = _unaccent(Property.name)
+        address_expr = _unaccent(func.coalesce(Property.address, ""))
+        document = func.to_tsvector(
+            "simple",
+            _unaccent(func.coalesce(Property.name, "") + " " + func.coalesce(Property.address, "")),
+        )
+
+        query_text = _unaccent(literal(keyword))
+        ts_query = func.plainto_tsquery("simple", query_text)
+        pattern = func.concat("%", _unaccent(literal(_escape_like(keyword))), "%")
+
+        rank = func.ts_rank(document, ts_query) + func.greatest(
+            func.word_similarity(query_text, name_expr),
+            func.word_similarity(query_text, address_expr),
+        )
 
         statement = (
             select(Property)
             .where(
-                (Property.name.ilike(pattern)) |
-                (Property.address.ilike(pattern))
+                document.op("@@")(ts_query) |
+                name_expr.like(pattern) |
+                address_expr.like(pattern) |
+                query_text.op("<%")(name_expr)
             )
             .where(Property.is_active == True)
         )
 
+        if sort == "rating":
+            statement = (
+                statement
+                .outerjoin(PropertyRatingStats, PropertyRatingStats.property_id == Property.id)
+                .order_by(
+                    average_rating().desc().nulls_last(),
+                    PropertyRatingStats.review_count.desc().nulls_last(),
+                    rank.desc(),
+                    Property.id,
+                )
+            )
+        else:
+            statement = statement.order_by(rank.desc(), Property.id)
+
+        statement = statement.offset(offset).limit(limit)
         results = session.exec(statement).all()
         return results
+
+    @staticmethod
+    def _geo_columns(distance):
+        return select(
+            Property.id,
+            Property.name,
+            Property.address,
+            Property.image,
+            Property.latitude,
+            Property.longitude,
+            distance.label("distance_m"),
+        ).where(Property.is_active == True)
+
+    @staticmethod
+    def search_nearby(
+        session: Session,
+        latitude: float,
+        longitude: float,
+        radius_m: int,
+        limit: int = 50,
+        offset: int = 0,
+    ):
+        # earth_box dùng được GiST index ix_property_earth, earth_distance lọc chính xác
+        origin = func.ll_to_earth(latitude, longitude)
+        point = func.ll_to_earth(Property.latitude, Property.longitude)
+        distance = func.earth_distance(origin, point)
+
+        statement = (
+            PropertySearchRepository._geo_columns(distance)
+            .where(Property.latitude.is_not(None))
+            .where(Property.longitude.is_not(None))
+            .where(func.earth_box(origin, radius_m).op("@>")(point))
+            .where(distance <= radius_m)
+            .order_by(distance, Property.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return session.exec(statement).all()
+
+    @staticmethod
+    def search_viewport(
+        session: Session,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+        limit: int = 100,
+        offset: int = 0,
+    ):
+        center = func.ll_to_earth(
+            (min_latitude + max_latitude) / 2,
+            (min_longitude + max_longitude) / 2,
+        )
+        distance = func.earth_distance(
+            center, func.ll_to_earth(Property.latitude, Property.longitude)
+        )
+
+        statement = (
+            PropertySearchRepository._geo_columns(distance)
+            .where(Property.latitude.between(min_latitude, max_latitude))
+            .where(Property.longitude.between(min_longitude, max_longitude))
+            .order_by(distance, Property.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return session.exec(statement).all()
@@ -0,0 +1,73 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import case, delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models.property_rating_stats import PropertyRatingStats
+from app.models.review import Review
+
+STARS = range(1, 6)
+
+
+def average_rating():
+    """Điểm trung bình, NULL khi chưa có review (dùng để sort)."""
+    return PropertyRatingStats.rating_sum * 1.0 / func.nullif(PropertyRatingStats.review_count, 0)
+
+
+class RatingStatsRepository:
+
+    @staticmethod
+    def apply(session: Session, property_id: int, rating: int, delta: int) -> None:
+        """delta = 1 khi thêm review, -1 khi xóa. Không commit."""
+        values = {
+            "property_id": property_id,
+            "review_count": delta,
+            "rating_sum": rating * delta,
+            **{f"count_{star}": delta if star == rating else 0 for star in STARS},
+        }
+        stmt = pg_insert(PropertyRatingStats).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PropertyRatingStats.property_id],
+            set_={
+                column: getattr(PropertyRatingStats, column) + getattr(stmt.excluded, column)
+                for column in values
+                if column != "property_id"
+            },
+        )
+        session.exec(stmt)
+
+    @staticmethod
+    def get_many(session: Session, property_ids: Iterable[int]) -> Dict[int, PropertyRatingStats]:
+        property_ids = list(property_ids)
+        if not property_ids:
+            return {}
+        stmt = select(PropertyRatingStats).where(PropertyRatingStats.property_id.in_(property_ids))
+        return {s.property_id: s for s in session.exec(stmt).all()}
+
+    @staticmethod
+    async def get_async(session: AsyncSession, property_id: int):
+        return await session.get(PropertyRatingStats, property_id)
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """Tính lại toàn bộ từ bảng review. Không commit."""
+        aggregates = (
+            select(
+                Review.property_id,
+                func.count(Review.id),
+                func.coalesce(func.sum(Review.rating), 0),
+                *[func.count(case((Review.rating == star, 1))) for star in STARS],
+            )
+            .group_by(Review.property_id)
+        )
+
+        session.exec(delete(PropertyRatingStats))
+        result = session.exec(
+            insert(PropertyRatingStats).from_select(
+                ["property_id", "review_count", "rating_sum", *[f"count_{star}" for star in STARS]],
+                aggregates,
+            )
+        )
+        return result.rowcount
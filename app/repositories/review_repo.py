@@ -1,28 +1,75 @@
+from typing import Optional, Tuple
+from sqlalchemy import tuple_
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.review import Review
 from app.models.user import User
 
+# sort -> cột sắp xếp; khớp với index (property_id, id) và (property_id, rating, id)
+REVIEW_SORTS = ("newest", "highest", "lowest")
+
 
 class ReviewRepository:
 
     @staticmethod
     def create(session: Session, review: Review):
+        # flush để service cập nhật rating stats cùng transaction rồi mới commit
         session.add(review)
-        session.commit()
-        session.refresh(review)
+        session.flush()
         return review
 
     @staticmethod
-    def get_by_property(session: Session, property_id: int):
+    def get_by_id(session: Session, review_id: int):
+        return session.get(Review, review_id)
+
+    @staticmethod
+    def _page_statement(property_id: int, sort: str, limit: int, cursor: Optional[Tuple[int, ...]]):
         stmt = (
             select(Review, User)
             .join(User, User.id == Review.user_id)
             .where(Review.property_id == property_id)
         )
-        rows = session.exec(stmt).all()
-        return rows
+
+        # keyset: cursor là khóa sort của dòng cuối trang trước
+        if sort == "highest":
+            if cursor:
+                stmt = stmt.where(tuple_(Review.rating, Review.id) < tuple_(*cursor))
+            stmt = stmt.order_by(Review.rating.desc(), Review.id.desc())
+        elif sort == "lowest":
+            if cursor:
+                stmt = stmt.where(tuple_(Review.rating, Review.id) > tuple_(*cursor))
+            stmt = stmt.order_by(Review.rating, Review.id)
+        else:
+            # review không có created_at; id tăng dần theo thời gian tạo
+            if cursor:
+                stmt = stmt.where(Review.id < cursor[-1])
+            stmt = stmt.order_by(Review.id.desc())
+
+        return stmt.limit(limit)
+
+    @staticmethod
+    def get_page(
+        session: Session,
+        property_id: int,
+        sort: str = "newest",
+        limit: int = 20,
+        cursor: Optional[Tuple[int, ...]] = None,
+    ):
+        stmt = ReviewRepository._page_statement(property_id, sort, limit, cursor)
+        return session.exec(stmt).all()
+
+    @staticmethod
+    async def get_page_async(
+        session: AsyncSession,
+        property_id: int,
+        sort: str = "newest",
+        limit: int = 20,
+        cursor: Optional[Tuple[int, ...]] = None,
+    ):
+        stmt = ReviewRepository._page_statement(property_id, sort, limit, cursor)
+        return (await session.exec(stmt)).all()
 
     @staticmethod
     def delete(session: Session, review: Review):
         session.delete(review)
-        session.commit()
+        session.flush()
@@ -1,34 +1,51 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.schemas.auth import SignupRequest
+from app.schemas.auth import SignupRequest, AuthUser, RefreshRequest, TokenData
 from app.schemas.user import StaffCreate, UserUpdate, UserRead
 from app.services.auth_service import AuthService
-from app.utils.dependencies import get_current_user, require_super_admin
-from app.core.database import get_session
+from app.utils.dependencies import get_current_user, get_current_principal, require_super_admin
+from app.core.database import get_session, get_async_session
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 auth_service = AuthService()
 
 
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+# async: chờ bcrypt ở process pool bằng await, không chiếm thread của threadpool
 @router.post("/register", response_model=UserRead)
-def register(payload: SignupRequest, session: Session = Depends(get_session)):
-    return auth_service.register(session, payload)
+async def register(
+    payload: SignupRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_async_session),
+):
+    return await auth_service.register(session, payload, client_ip=_client_ip(request))
 
 
 @router.post("/login")
-def login(
+async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    return auth_service.login(
+    return await auth_service.login(
         session=session,
         email=form_data.username,
-        password=form_data.password
+        password=form_data.password,
+        client_ip=_client_ip(request)
     )
 
 
+@router.post("/refresh", response_model=TokenData)
+def refresh(payload: RefreshRequest):
+    return auth_service.refresh(payload.refresh_token)
+
+
 @router.post("/create-staff", response_model=UserRead)
 def create_staff(
     payload: StaffCreate,
@@ -48,7 +65,7 @@ def list_users(
 
 @router.get("/me", response_model=UserRead)
 def get_current_user_profile(
-    user: UserRead = Depends(get_current_user),
+    user: AuthUser = Depends(get_current_principal),
     session: Session = Depends(get_session)
 ):
 
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from app.core.database import pool_stats
+from app.utils.dependencies import require_super_admin
+from app.utils.redis_cache import cache_stats, job_stats
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(require_super_admin)],
+)
+
+
+@router.get("/cache")
+def get_cache_metrics():
+    return cache_stats()
+
+
+@router.get("/db")
+def get_db_metrics():
+    return pool_stats()
+
+
+@router.get("/jobs")
+def get_job_metrics():
+    return {
+        "cleanup_expired_bookings": job_stats("cleanup_expired_bookings"),
+        "expire_booking": job_stats("expire_booking"),
+        "reconcile_room_inventory": job_stats("reconcile_room_inventory"),
+    }
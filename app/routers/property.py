@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlmodel import Session
 
-from app.core.database import get_session
+from app.core.database import get_read_session
 from app.services.property_service import PropertyService
 from app.schemas.property import PropertyRead
 
@@ -9,5 +12,40 @@ router = APIRouter(prefix="/properties", tags=["Property"])
 
 
 @router.get("", response_model=list[PropertyRead])
-def list_properties(session: Session = Depends(get_session)):
-    return PropertyService.list_properties(session)
+def list_properties(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[int] = Query(
+        default=None,
+        description="Giá trị X-Next-Cursor của trang trước"
+    ),
+    fields: Optional[str] = Query(
+        default=None,
+        example="id,name,image,latitude,longitude",
+        description="Chỉ trả về các field này (phân tách bằng dấu phẩy)"
+    ),
+    session: Session = Depends(get_read_session),
+):
+
+    selected = None
+    if fields:
+        selected = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in selected if f not in PropertyRead.model_fields]
+        if unknown:
+            raise HTTPException(400, f"Field không hợp lệ: {', '.join(unknown)}")
+
+    raw, next_cursor = PropertyService.list_properties(
+        session,
+        limit=limit,
+        cursor=cursor,
+        fields=selected,
+    )
+
+    headers = {"ETag": f'"{hashlib.sha1(raw).hexdigest()}"'}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = str(next_cursor)
+
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=raw, media_type="application/json", headers=headers)
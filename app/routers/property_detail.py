@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
-from app.core.database import get_session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.database import get_async_session
 from app.schemas.property_detail import PropertyDetailRead
 from app.services.property_service import PropertyService
 
@@ -8,8 +8,8 @@ router = APIRouter(prefix="/properties", tags=["Properties"])
 
 
 @router.get("/{property_id}", response_model=PropertyDetailRead)
-def get_detail(property_id: int, session: Session = Depends(get_session)):
-    result = PropertyService.get_detail(session, property_id)
-    if not result:
+async def get_detail(property_id: int, session: AsyncSession = Depends(get_async_session)):
+    raw = await PropertyService.get_detail(session, property_id)
+    if not raw:
         raise HTTPException(404, "Property not found")
-    return result
+    return Response(content=raw, media_type="application/json")
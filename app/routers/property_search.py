@@ -1,13 +1,48 @@
 # app/routers/property_search.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlmodel import Session
-from app.core.database import get_session
-from app.schemas.property_search import PropertySearchRequest, PropertySearchResponse
+from app.core.database import get_session, get_read_session
+from app.schemas.property_search import (
+    PropertySearchRequest,
+    PropertySearchResponse,
+    PropertyNearbyRequest,
+    PropertyViewportRequest,
+    PropertyGeoResponse,
+)
+from app.schemas.room_search import RoomSearchRequest, RoomSearchResponse
 from app.services.property_search_service import PropertySearchService
+from app.services.room_search_service import RoomSearchService
 
 router = APIRouter(prefix="/search", tags=["Search"])
 
 
 @router.post("/property", response_model=PropertySearchResponse)
-def search_property(payload: PropertySearchRequest, session: Session = Depends(get_session)):
-    return PropertySearchService.search(session, payload.keyword)
+def search_property(payload: PropertySearchRequest, session: Session = Depends(get_read_session)):
+    raw = PropertySearchService.search(session, payload)
+    return Response(content=raw, media_type="application/json")
+
+
+@router.post("/nearby", response_model=PropertyGeoResponse)
+def search_nearby(payload: PropertyNearbyRequest, session: Session = Depends(get_read_session)):
+    raw = PropertySearchService.search_nearby(session, payload)
+    return Response(content=raw, media_type="application/json")
+
+
+@router.post("/viewport", response_model=PropertyGeoResponse)
+def search_viewport(payload: PropertyViewportRequest, session: Session = Depends(get_read_session)):
+    if payload.min_latitude > payload.max_latitude or payload.min_longitude > payload.max_longitude:
+        raise HTTPException(400, "Khung bản đồ không hợp lệ")
+
+    raw = PropertySearchService.search_viewport(session, payload)
+    return Response(content=raw, media_type="application/json")
+
+
+@router.post("/rooms", response_model=RoomSearchResponse)
+def search_rooms(payload: RoomSearchRequest, session: Session = Depends(get_session)):
+    if payload.checkout <= payload.checkin:
+        raise HTTPException(400, "Ngày trả phòng phải sau ngày nhận phòng")
+
+    raw = RoomSearchService.search(session, payload)
+    if not raw:
+        raise HTTPException(404, "Property not found")
+    return Response(content=raw, media_type="application/json")
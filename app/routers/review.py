@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlmodel import Session
-from app.core.database import get_session
+from app.core.database import get_session, get_read_session
 from app.schemas.review import ReviewCreate, ReviewRead
 from app.services.review_service import ReviewService
-from app.utils.dependencies import get_current_user, require_staff
+from app.utils.dependencies import get_current_principal, require_staff
 
 router = APIRouter(prefix="/reviews", tags=["Review"])
 
@@ -12,14 +13,33 @@ router = APIRouter(prefix="/reviews", tags=["Review"])
 def create_review(
     payload: ReviewCreate,
     session: Session = Depends(get_session),
-    user=Depends(get_current_user)
+    user=Depends(get_current_principal)
 ):
     return ReviewService.add_review(session, user.id, payload)
 
 
 @router.get("/property/{property_id}", response_model=list[ReviewRead])
-def list_reviews(property_id: int, session: Session = Depends(get_session)):
-    return ReviewService.get_reviews_for_property(session, property_id)
+def list_reviews(
+    property_id: int,
+    response: Response,
+    sort: Literal["newest", "highest", "lowest"] = "newest",
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Giá trị X-Next-Cursor của trang trước"
+    ),
+    session: Session = Depends(get_read_session),
+):
+    try:
+        reviews, next_cursor = ReviewService.get_review_page(
+            session, property_id, sort=sort, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return reviews
 
 
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from datetime import date, timedelta
 from sqlmodel import Session
 from app.core.database import get_session
@@ -27,6 +27,8 @@ def get_available_rooms(
         checkin = date.today()
     if checkout is None:
         checkout = checkin + timedelta(days=1)
+    if checkout <= checkin:
+        raise HTTPException(400, "Ngày trả phòng phải sau ngày nhận phòng")
 
     return RoomService.get_available_rooms(
         session=session,
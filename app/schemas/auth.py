@@ -15,6 +15,10 @@ class TokenData(BaseModel):
     token_type: str = "bearer"
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 
 class SignupRequest(BaseModel):
     email: EmailStr
@@ -47,3 +51,10 @@ class UserRead(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class AuthUser(BaseModel):
+    """Người dùng lấy từ claim của access token, không cần query DB."""
+    id: int
+    role: UserRole
+    property_id: Optional[int] = None
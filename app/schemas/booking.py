@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 from datetime import date, datetime
 from typing import List, Optional
 
@@ -9,6 +9,13 @@ class BookingCreate(BaseModel):
     checkout: date
     num_guests: int = 1
 
+    @model_validator(mode="after")
+    def check_dates(self):
+        # daterange của Postgres lỗi khi checkout < checkin, và 0 đêm thì không giữ được đêm nào
+        if self.checkout <= self.checkin:
+            raise ValueError("Ngày trả phòng phải sau ngày nhận phòng")
+        return self
+
 
 class BookedRoomRead(BaseModel):
     id: int
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import Optional
+from app.schemas.review import RatingStatsRead
 
 
 
@@ -38,6 +39,7 @@ class PropertyUpdate(BaseModel):
 
 class PropertyRead(PropertyBase):
     id: int
+    rating: Optional[RatingStatsRead] = None
 
     class Config:
         from_attributes = True
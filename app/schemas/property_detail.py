@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from app.schemas.review import ReviewRead
+from app.schemas.review import ReviewRead, RatingStatsRead
 
 
 class RoomRead(BaseModel):
@@ -40,6 +40,7 @@ class PropertyDetailRead(BaseModel):
 
     room_types: List[RoomTypeWithRoomsRead]
     reviews: List[ReviewRead] = []   # 🔥 ADD THIS
+    rating: Optional[RatingStatsRead] = None
 
     class Config:
         from_attributes = True
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from app.schemas.review import RatingStatsRead
 
 
 class PropertyItem(BaseModel):
@@ -9,6 +10,7 @@ class PropertyItem(BaseModel):
     image: Optional[str]
     latitude: Optional[float]
     longitude: Optional[float]
+    rating: Optional[RatingStatsRead] = None
 
     class Config:
         from_attributes = True
@@ -16,7 +18,38 @@ class PropertyItem(BaseModel):
 
 class PropertySearchRequest(BaseModel):
     keyword: str
+    limit: int = Field(default=20, ge=1, le=100)
+    offset: int = Field(default=0, ge=0)
+    # rating: điểm trung bình giảm dần, cùng điểm thì nhiều review hơn lên trước
+    sort: Literal["relevance", "rating"] = "relevance"
 
 
 class PropertySearchResponse(BaseModel):
     results: List[PropertyItem]
+    next_offset: Optional[int] = None
+
+
+class PropertyGeoItem(PropertyItem):
+    distance_m: float
+
+
+class PropertyNearbyRequest(BaseModel):
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+    radius_m: int = Field(default=5000, gt=0, le=50000)
+    limit: int = Field(default=50, ge=1, le=200)
+    offset: int = Field(default=0, ge=0)
+
+
+class PropertyViewportRequest(BaseModel):
+    min_latitude: float = Field(ge=-90, le=90)
+    min_longitude: float = Field(ge=-180, le=180)
+    max_latitude: float = Field(ge=-90, le=90)
+    max_longitude: float = Field(ge=-180, le=180)
+    limit: int = Field(default=100, ge=1, le=500)
+    offset: int = Field(default=0, ge=0)
+
+
+class PropertyGeoResponse(BaseModel):
+    results: List[PropertyGeoItem]
+    next_offset: Optional[int] = None
@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
 
 
 class ReviewBase(BaseModel):
@@ -9,6 +9,7 @@ class ReviewBase(BaseModel):
 
 class ReviewCreate(ReviewBase):
     property_id: int
+    rating: int = Field(ge=1, le=5)
 
 
 class ReviewRead(ReviewBase):
@@ -18,3 +19,20 @@ class ReviewRead(ReviewBase):
 
     class Config:
         from_attributes = True
+
+
+class RatingStatsRead(BaseModel):
+    average: Optional[float] = None
+    count: int = 0
+    histogram: Dict[int, int] = {}
+
+    @classmethod
+    def from_stats(cls, stats) -> "RatingStatsRead":
+        """stats: PropertyRatingStats hoặc None (chưa có review)."""
+        if not stats or stats.review_count <= 0:
+            return cls(histogram={star: 0 for star in range(1, 6)})
+        return cls(
+            average=round(stats.rating_sum / stats.review_count, 2),
+            count=stats.review_count,
+            histogram={star: getattr(stats, f"count_{star}") for star in range(1, 6)},
+        )
@@ -1,12 +1,19 @@
+import redis
 from fastapi import HTTPException, status
+from jose import jwt, JWTError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.repositories.auth_repo import AuthRepository
 from app.models.user import User
 from app.utils.enums import UserRole
+from app.core.config import settings
+from app.utils import refresh_tokens
+from app.utils.rate_limit import concurrency_slots_async
 from app.utils.security import (
     hash_password,
-    verify_password,
+    hash_password_async,
+    verify_and_update_password_async,
     create_access_token,
     create_refresh_token
 )
@@ -18,29 +25,34 @@ class AuthService:
         self.repo = AuthRepository()
 
 
-    def register(self, session: Session, data):
+    async def register(self, session: AsyncSession, data, client_ip: str = None):
 
 
-        if self.repo.get_user_by_email(session, data.email):
+        if await self.repo.get_user_by_email_async(session, data.email):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already exists"
             )
 
+        async with concurrency_slots_async(
+            (f"auth:inflight:ip:{client_ip}", settings.LOGIN_MAX_CONCURRENT_PER_IP),
+        ):
+            password_hash = await hash_password_async(data.password)
+
         new_user = User(
             email=data.email,
             full_name=data.full_name,
             phone=data.phone,
-            password_hash=hash_password(data.password),
+            password_hash=password_hash,
             role=UserRole.CUSTOMER,
         )
 
-        return self.repo.create_user(session, new_user)
+        return await self.repo.save_user_async(session, new_user)
 
 
-    def login(self, session: Session, email: str, password: str):
+    async def login(self, session: AsyncSession, email: str, password: str, client_ip: str = None):
 
-        user = self.repo.get_user_by_email(session, email)
+        user = await self.repo.get_user_by_email_async(session, email)
 
         if not user:
             raise HTTPException(
@@ -48,19 +60,44 @@ class AuthService:
                 detail="Email not found"
             )
 
-        if not verify_password(password, user.password_hash):
+        # giới hạn số lần verify bcrypt chạy cùng lúc cho 1 tài khoản / 1 IP
+        async with concurrency_slots_async(
+            (f"auth:inflight:user:{user.id}", settings.LOGIN_MAX_CONCURRENT_PER_ACCOUNT),
+            (f"auth:inflight:ip:{client_ip}", settings.LOGIN_MAX_CONCURRENT_PER_IP),
+        ):
+            valid, new_hash = await verify_and_update_password_async(password, user.password_hash)
+
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
             )
 
+        # access token không bị kiểm tra lại is_active (AUTH_STATELESS) nên phải chặn từ lúc login
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Inactive user"
+            )
+
+        # cost bcrypt đã đổi: lưu lại hash mới, người dùng không phải làm gì
+        if new_hash:
+            user.password_hash = new_hash
+            await self.repo.save_user_async(session, user)
+
         # Create tokens
         access_token = create_access_token(
             sub=str(user.id),
-            role=user.role.value
+            role=user.role.value,
+            property_id=user.property_id
+        )
+        family, jti = await refresh_tokens.start_family_async(
+            user.id, user.role.value, user.property_id
         )
         refresh_token = create_refresh_token(
-            sub=str(user.id)
+            sub=str(user.id),
+            family=family,
+            jti=jti
         )
 
         return {
@@ -77,6 +114,67 @@ class AuthService:
         }
 
 
+    def refresh(self, token: str):
+        """Đổi refresh token lấy cặp token mới, không cần mật khẩu hay query DB."""
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+
+        family, jti = payload.get("fam"), payload.get("jti")
+        if payload.get("scope") != "refresh" or not family or not jti:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
+            )
+
+        user_id = int(payload["sub"])
+        next_jti = refresh_tokens.new_jti()
+        try:
+            # mốc thu hồi đọc thẳng trong script, không qua cache local
+            result = refresh_tokens.rotate(family, user_id, jti, next_jti)
+        except redis.RedisError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Token service unavailable"
+            )
+
+        if result == refresh_tokens.TOKEN_REUSED:
+            # refresh token cũ bị dùng lại: cả family đã bị hủy, phải login lại
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token reused"
+            )
+        if result == refresh_tokens.FAMILY_REVOKED:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token revoked"
+            )
+        if result == refresh_tokens.FAMILY_MISSING:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token expired or revoked"
+            )
+
+        issued_jti, user_id, role, property_id = result
+        return {
+            "access_token": create_access_token(
+                sub=str(user_id),
+                role=role,
+                property_id=property_id
+            ),
+            "refresh_token": create_refresh_token(
+                sub=str(user_id),
+                family=family,
+                jti=issued_jti
+            ),
+            "token_type": "bearer",
+        }
+
+
     def create_staff(self, session: Session, data):
 
 
@@ -1,59 +1,89 @@
+import asyncio
+from datetime import datetime, timedelta
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models import Booking, BookedRoom
+from app.repositories.availability_repo import AvailabilityRepository
 from app.repositories.booking_repo import BookingRepository
-from app.repositories.room_repo import RoomRepository
+from app.repositories.inventory_repo import InventoryRepository
 from app.models.room import Room
-from app.utils.lock import acquire_room_lock, release_room_lock
+from app.models.room_type import RoomType
+from app.core.config import settings
+from app.core.logger import logger
+from app.worker.tasks import expire_booking
+from app.utils.lock import (
+    release_room_holds,
+    acquire_room_holds_async,
+    release_room_holds_async,
+)
 
 
 class BookingService:
 
     @staticmethod
-    def create_booking(session: Session, user_id: int, payload):
+    async def create_booking(session: AsyncSession, user_id: int, payload):
         checkin = payload.checkin
         checkout = payload.checkout
-        selected_rooms = payload.room_ids
+        selected_rooms = list(dict.fromkeys(payload.room_ids))
 
         if not selected_rooms:
             raise Exception("Vui lòng chọn ít nhất 1 phòng")
 
-        locked_rooms = []
-
+        unavailable = await AvailabilityRepository.get_unavailable_room_ids(
+            session, selected_rooms, checkin, checkout
+        )
+        if unavailable:
+            raise Exception(f"Phòng {unavailable[0]} không còn trống")
+
+        # TTL của hold khớp với expires_at của booking
+        hold_seconds = settings.BOOKING_HOLD_MINUTES * 60
+        expires_at = datetime.utcnow() + timedelta(seconds=hold_seconds)
+
+        booking = await BookingRepository.create(
+            session=session,
+            user_id=user_id,
+            checkin=checkin,
+            checkout=checkout,
+            num_guests=payload.num_guests,
+            selected_rooms=selected_rooms,
+            expires_at=expires_at
+        )
+
+        conflict = await acquire_room_holds_async(
+            booking.id, selected_rooms, checkin, checkout, hold_seconds
+        )
+        if conflict is not None:
+            await session.rollback()
+            raise Exception(f"Phòng {conflict} đang được người khác giữ")
 
         try:
-            for room_id in selected_rooms:
-                if not RoomRepository.is_available(session, room_id, checkin, checkout):
-                    raise Exception(f"Phòng {room_id} không còn trống")
-
-                ok = acquire_room_lock(room_id, checkin, checkout)
-                if not ok:
-                    raise Exception(f"Phòng {room_id} đang được người khác giữ")
-
-                locked_rooms.append(room_id)
-
-
-            booking = BookingRepository.create(
-                session=session,
-                user_id=user_id,
-                checkin=checkin,
-                checkout=checkout,
-                num_guests=payload.num_guests,
-                selected_rooms=selected_rooms
-            )
-
+            await InventoryRepository.adjust_async(session, selected_rooms, checkin, checkout, held=1)
+            await session.commit()
         except Exception:
 
-            for rid in locked_rooms:
-                release_room_lock(rid, checkin, checkout)
+            await release_room_holds_async(booking.id, selected_rooms, checkin, checkout)
             raise
 
+        # hủy đúng lúc hết hạn; countdown thay vì eta để khỏi lệch múi giờ của Celery.
+        # Nếu không enqueue được thì cleanup_expired_bookings vẫn dọn sau.
+        try:
+            await asyncio.to_thread(
+                expire_booking.apply_async,
+                args=[booking.id],
+                countdown=hold_seconds + settings.BOOKING_EXPIRY_GRACE_SECONDS,
+                retry=False,
+            )
+        except Exception as e:
+            logger.error(f"[BookingService] Failed to schedule expiry #{booking.id}: {e}")
 
         nights = (checkout - checkin).days
-        total = 0
-        for rid in selected_rooms:
-            room = session.get(Room, rid)
-            total += room.room_type.price * nights
+        prices = (await session.exec(
+            select(RoomType.price)
+            .join(Room, Room.room_type_id == RoomType.id)
+            .where(Room.id.in_(selected_rooms))
+        )).all()
+        total = sum(prices) * nights
 
         return {
             "booking_id": booking.id,
@@ -64,12 +94,13 @@ class BookingService:
         }
 
     @staticmethod
-    def get_my_bookings(session: Session, user_id: int):
-        return BookingRepository.get_by_user(session, user_id)
+    async def get_my_bookings(session: AsyncSession, user_id: int):
+        return await BookingRepository.get_by_user(session, user_id)
 
     @staticmethod
     def cancel_booking(session: Session, booking_id: int, user_id: int):
-        booking = session.get(Booking, booking_id)
+        # khóa dòng: cleanup/expire_booking/thanh toán cùng lúc sẽ phải chờ, rồi thấy status mới
+        booking = session.get(Booking, booking_id, with_for_update=True)
         if not booking:
             raise Exception("Booking không tồn tại")
 
@@ -78,8 +109,10 @@ class BookingService:
 
 
         if booking.status == "pending":
-            for rid in booking.selected_rooms:
-                release_room_lock(rid, booking.checkin, booking.checkout)
+            release_room_holds(booking.id, booking.selected_rooms, booking.checkin, booking.checkout)
+            InventoryRepository.adjust(
+                session, booking.selected_rooms, booking.checkin, booking.checkout, held=-1
+            )
 
             booking.status = "cancelled"
             session.commit()
@@ -93,6 +126,9 @@ class BookingService:
 
             for row in rows:
                 session.delete(row)
+            InventoryRepository.adjust(
+                session, [row.room_id for row in rows], booking.checkin, booking.checkout, booked=-1
+            )
 
             booking.status = "cancelled"
             session.commit()
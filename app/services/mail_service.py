@@ -1,6 +1,8 @@
-import smtplib
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from sqlmodel import Session, select
 
 from app.core.config import settings
@@ -11,142 +13,146 @@ from app.models.user import User
 from app.models.room import Room
 from app.models.room_type import RoomType
 from app.core.logger import logger
+from app.utils.smtp_pool import smtp_pool
+
+# Template được compile 1 lần khi import (lúc worker khởi động), render lại không parse nữa
+_env = Environment(
+    loader=FileSystemLoader(Path(__file__).resolve().parent.parent / "templates" / "email"),
+    autoescape=select_autoescape(["html"]),
+)
+BOOKING_TEMPLATE = _env.get_template("booking_confirmation.html")
+PAYMENT_TEMPLATE = _env.get_template("payment_success.html")
 
 
 class MailService:
 
 
 
-    def __init__(self):
-        self.smtp_server = settings.MAIL_SERVER
-        self.smtp_port = settings.MAIL_PORT
-        self.username = settings.MAIL_USERNAME
-        self.password = settings.MAIL_PASSWORD
+    def __init__(self, pool=smtp_pool):
+        self.pool = pool
         self.sender = settings.MAIL_FROM
         self.sender_name = settings.MAIL_FROM_NAME
-        self.use_tls = settings.MAIL_STARTTLS
-        self.use_ssl = settings.MAIL_SSL_TLS
 
 
 
     def send_booking_confirmation(self, booking_id: int):
         with Session(engine) as session:
-            booking = session.get(Booking, booking_id)
-            if not booking:
-                logger.error(f"[MailService] Booking not found #{booking_id}")
-                return False
+            rendered = self.render_booking_emails(session, [booking_id])
+
+        if booking_id not in rendered:
+            logger.error(f"[MailService] Booking not found #{booking_id}")
+            return False
+
+        to, subject, html_body = rendered[booking_id]
+
+        # lỗi gửi được ném lên để task Celery retry
+        try:
+            self._send_email(to=to, subject=subject, html_body=html_body)
+        except Exception as e:
+            logger.error(f"[MailService] Failed to send booking email: {e}")
+            raise
 
-            user = session.get(User, booking.user_id)
-            rooms = session.exec(
-                select(BookedRoom).where(BookedRoom.booking_id == booking_id)
-            ).all()
+        logger.info(f"[MailService] Booking email sent #{booking_id}")
+        return True
 
-            html_body = self._build_booking_email_template(session, user, booking, rooms)
 
+
+    def send_booking_confirmations(self, booking_ids: Iterable[int]) -> int:
+        """Gửi hàng loạt: render mọi booking trong 1 lượt rồi gửi qua pool SMTP."""
+        with Session(engine) as session:
+            rendered = self.render_booking_emails(session, booking_ids)
+
+        sent = 0
+        for booking_id, (to, subject, html_body) in rendered.items():
             try:
-                self._send_email(
-                    to=user.email,
-                    subject=f"Booking Confirmation #{booking_id}",
-                    html_body=html_body,
-                )
-                logger.info(f"[MailService] Booking email sent #{booking_id}")
-                return True
+                self._send_email(to=to, subject=subject, html_body=html_body)
+                sent += 1
             except Exception as e:
-                logger.error(f"[MailService] Failed to send booking email: {e}")
-                return False
-
-
-
-    def _build_booking_email_template(self, session, user, booking, rooms):
-        room_items = ""
-
-        for r in rooms:
-            room_obj = session.exec(select(Room).where(Room.id == r.room_id)).first()
-            room_type = session.get(RoomType, room_obj.room_type_id)
-
-            room_items += f"""
-                <tr>
-                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{r.room_id}</td>
-                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{room_type.name}</td>
-                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{r.checkin} → {r.checkout}</td>
-                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{room_type.price:,} đ/đêm</td>
-                </tr>
-            """
-
-        html = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto;">
-
-                <h2 style="color: #2b7cff;">Xin chào {user.full_name},</h2>
-                <p>Cảm ơn bạn đã sử dụng hệ thống <strong>Hotel Booking</strong>.</p>
-
-                <h3 style="margin-top: 30px;">Thông tin đặt phòng</h3>
-                <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
-                    <tr style="background-color: #f5f5f5;">
-                        <th style="padding: 8px; text-align: left;">Mã Booking</th>
-                        <th style="padding: 8px; text-align: left;">Ngày tạo</th>
-                    </tr>
-                    <tr>
-                        <td style="padding: 8px;">#{booking.id}</td>
-                        <td style="padding: 8px;">{booking.booking_date}</td>
-                    </tr>
-                </table>
-
-                <h3 style="margin-top: 20px;">Chi tiết phòng</h3>
-                <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
-                    <tr style="background-color: #f5f5f5;">
-                        <th style="padding: 8px; text-align: left;">Room ID</th>
-                        <th style="padding: 8px; text-align: left;">Loại Phòng</th>
-                        <th style="padding: 8px; text-align: left;">Thời gian</th>
-                        <th style="padding: 8px; text-align: left;">Giá</th>
-                    </tr>
-                    {room_items}
-                </table>
-
-                <p style="margin-top: 30px;">Nếu bạn cần hỗ trợ thêm, hãy phản hồi email này.</p>
-                <p>Trân trọng,<br> <strong>{self.sender_name}</strong></p>
-            </div>
-        </body>
-        </html>
-        """
-        return html
+                logger.error(f"[MailService] Failed to send booking email #{booking_id}: {e}")
+
+        logger.info(f"[MailService] Booking emails sent {sent}/{len(rendered)}")
+        return sent
+
+
+
+    def render_booking_emails(
+        self, session: Session, booking_ids: Iterable[int]
+    ) -> Dict[int, Tuple[str, str, str]]:
+        """booking_id -> (email, subject, html), 2 truy vấn cho cả lô booking."""
+        booking_ids = list(dict.fromkeys(booking_ids))
+        if not booking_ids:
+            return {}
+
+        bookings = session.exec(
+            select(Booking.id, Booking.booking_date, User.email, User.full_name)
+            .join(User, User.id == Booking.user_id)
+            .where(Booking.id.in_(booking_ids))
+        ).all()
+
+        rooms_by_booking = {}
+        rows = session.exec(
+            select(
+                BookedRoom.booking_id,
+                BookedRoom.room_id,
+                BookedRoom.checkin,
+                BookedRoom.checkout,
+                RoomType.name,
+                RoomType.price,
+            )
+            .join(Room, Room.id == BookedRoom.room_id)
+            .join(RoomType, RoomType.id == Room.room_type_id)
+            .where(BookedRoom.booking_id.in_(booking_ids))
+            .order_by(BookedRoom.booking_id, BookedRoom.room_id)
+        ).all()
+        for booking_id, room_id, checkin, checkout, type_name, price in rows:
+            rooms_by_booking.setdefault(booking_id, []).append({
+                "room_id": room_id,
+                "room_type": type_name,
+                "checkin": checkin,
+                "checkout": checkout,
+                "price": price,
+            })
+
+        rendered = {}
+        for booking_id, booking_date, email, full_name in bookings:
+            html = BOOKING_TEMPLATE.render(
+                user_name=full_name,
+                booking_id=booking_id,
+                booking_date=booking_date,
+                rooms=rooms_by_booking.get(booking_id, []),
+                sender_name=self.sender_name,
+            )
+            rendered[booking_id] = (email, f"Booking Confirmation #{booking_id}", html)
+        return rendered
 
 
 
     def send_payment_success(self, booking_id: int):
         with Session(engine) as session:
-            booking = session.get(Booking, booking_id)
-            if not booking:
-                logger.error(f"[MailService] Payment mail failed: #{booking_id} not found")
-                return False
-
-            user = session.get(User, booking.user_id)
-
-            html_body = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto;">
-                    <h2 style="color: #28a745;">Thanh toán thành công!</h2>
-                    <p>Booking <strong>#{booking.id}</strong> của bạn đã được thanh toán.</p>
-                    <p>Cảm ơn bạn đã sử dụng dịch vụ!</p>
-                </div>
-            </body>
-            </html>
-            """
+            row = session.exec(
+                select(User.email)
+                .join(Booking, Booking.user_id == User.id)
+                .where(Booking.id == booking_id)
+            ).first()
 
-            try:
-                self._send_email(
-                    to=user.email,
-                    subject=f"Payment Success #{booking_id}",
-                    html_body=html_body,
-                )
-                logger.info(f"[MailService] Payment email sent #{booking_id}")
-                return True
+        if not row:
+            logger.error(f"[MailService] Payment mail failed: #{booking_id} not found")
+            return False
 
-            except Exception as e:
-                logger.error(f"[MailService] Failed to send payment email: {e}")
-                return False
+        html_body = PAYMENT_TEMPLATE.render(booking_id=booking_id)
+
+        try:
+            self._send_email(
+                to=row,
+                subject=f"Payment Success #{booking_id}",
+                html_body=html_body,
+            )
+        except Exception as e:
+            logger.error(f"[MailService] Failed to send payment email: {e}")
+            raise
+
+        logger.info(f"[MailService] Payment email sent #{booking_id}")
+        return True
 
 
 
@@ -157,16 +163,4 @@ class MailService:
         msg["Subject"] = subject
         msg.attach(MIMEText(html_body, "html"))
 
-
-        if self.use_ssl:
-            with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                server.login(self.username, self.password)
-                server.sendmail(self.sender, to, msg.as_string())
-            return
-
-
-        with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-            if self.use_tls:
-                server.starttls()
-            server.login(self.username, self.password)
-            server.sendmail(self.sender, to, msg.as_string())
+        self.pool.send(self.sender, to, msg.as_string())
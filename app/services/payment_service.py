@@ -1,14 +1,18 @@
 import uuid
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from app.models import Payment
 from app.repositories.booked_room_repo import BookedRoomRepository
+from app.repositories.inventory_repo import InventoryRepository
 from app.repositories.payment_repo import PaymentRepository
 from app.models.booking import Booking
-from app.utils.lock import release_room_lock
+from app.models.booked_room import NO_OVERLAP_CONSTRAINT
+from app.utils.lock import release_room_holds
 from app.utils.qr_generator import generate_qr_base64
-from app.services.mail_service import MailService
+from app.core.logger import logger
+from app.worker.tasks import send_booking_confirmation_email, send_payment_success_email
 
 
 class PaymentService:
@@ -41,20 +45,29 @@ class PaymentService:
 
     @staticmethod
     def confirm_payment(session: Session, payment_id: int):
-        mailer = MailService()
-
         payment = session.get(Payment, payment_id)
         if not payment:
             raise Exception("Payment không tồn tại")
 
-        booking = payment.booking
+        # khóa dòng booking để 2 lần xác nhận cùng lúc không chốt phòng 2 lần
+        booking = session.get(Booking, payment.booking_id, with_for_update=True)
         if not booking:
             raise Exception("Booking không tồn tại")
 
+        if booking.status == "confirmed":
+            return {
+                "message": "Thanh toán thành công",
+                "booking_id": booking.id,
+                "status": "confirmed"
+            }
+        if booking.status != "pending":
+            raise Exception("Booking đã bị hủy — không thể thanh toán")
 
         if booking.expires_at < datetime.utcnow():
-            for rid in booking.selected_rooms:
-                release_room_lock(rid, booking.checkin, booking.checkout)
+            release_room_holds(booking.id, booking.selected_rooms, booking.checkin, booking.checkout)
+            InventoryRepository.adjust(
+                session, booking.selected_rooms, booking.checkin, booking.checkout, held=-1
+            )
 
             booking.status = "cancelled"
             session.commit()
@@ -63,27 +76,51 @@ class PaymentService:
 
         payment.status = "completed"
 
-
-        for rid in booking.selected_rooms:
-            BookedRoomRepository.create(
+        try:
+            BookedRoomRepository.create_many(
                 session=session,
                 booking_id=booking.id,
-                room_id=rid,
+                room_ids=booking.selected_rooms,
                 checkin=booking.checkin,
                 checkout=booking.checkout
             )
+            InventoryRepository.adjust(
+                session, booking.selected_rooms, booking.checkin, booking.checkout, booked=1, held=-1
+            )
 
-            release_room_lock(rid, booking.checkin, booking.checkout)
-
-        booking.status = "confirmed"
-        session.commit()
-
+            booking.status = "confirmed"
+            session.commit()
 
+        except IntegrityError as e:
+            session.rollback()
+            if NO_OVERLAP_CONSTRAINT not in str(e.orig):
+                raise
+
+            # phòng đã bị booking khác chốt trong khoảng ngày này.
+            # rollback đã nhả khóa: khóa lại và chỉ hủy nếu chưa ai (cleanup, hủy tay) xử lý trước
+            booking = session.get(Booking, booking.id, with_for_update=True)
+            if booking and booking.status == "pending":
+                InventoryRepository.adjust(
+                    session, booking.selected_rooms, booking.checkin, booking.checkout, held=-1
+                )
+                booking.status = "cancelled"
+                session.commit()
+                release_room_holds(booking.id, booking.selected_rooms, booking.checkin, booking.checkout)
+            else:
+                session.rollback()
+            raise Exception("Phòng đã được đặt trong khoảng thời gian này — không thể thanh toán")
+
+        # mọi đêm của mọi phòng được nhả trong 1 lần gọi script
+        release_room_holds(booking.id, booking.selected_rooms, booking.checkin, booking.checkout)
+
+
+        # gửi mail ở worker, không chặn response thanh toán
         try:
-            mailer.send_booking_confirmation(booking.id)
-            mailer.send_payment_success(booking.id)
+            # retry=False: broker chết thì báo lỗi ngay thay vì giữ response thanh toán
+            send_booking_confirmation_email.apply_async(args=[booking.id], retry=False)
+            send_payment_success_email.apply_async(args=[booking.id], retry=False)
         except Exception as e:
-            print("Email sending failed:", e)
+            logger.error(f"[PaymentService] Failed to enqueue emails #{booking.id}: {e}")
 
         return {
             "message": "Thanh toán thành công",
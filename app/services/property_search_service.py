@@ -1,33 +1,157 @@
 # app/services/property_search_service.py
 from sqlmodel import Session
 from app.repositories.property_search_repo import PropertySearchRepository
-from app.schemas.property_search import PropertyItem, PropertySearchResponse
-from app.utils.redis_cache import r, make_key, cache_get, cache_set
+from app.repositories.rating_stats_repo import RatingStatsRepository
+from app.schemas.review import RatingStatsRead
+from app.schemas.property_search import (
+    PropertyItem,
+    PropertySearchRequest,
+    PropertySearchResponse,
+    PropertyGeoItem,
+    PropertyNearbyRequest,
+    PropertyViewportRequest,
+    PropertyGeoResponse,
+)
+from app.utils.redis_cache import (
+    make_key,
+    cache_get_or_build,
+    property_tag,
+    SEARCH_PROPERTY_TAG,
+)
+
+
+SEARCH_CACHE_SECONDS = 60 * 60
+SEARCH_STALE_SECONDS = 60 * 60
+GEO_CACHE_SECONDS = 60 * 5
+
+# ~11m, đủ để các lần kéo bản đồ gần nhau dùng chung cache
+GEO_PRECISION = 4
 
 
 class PropertySearchService:
 
     @staticmethod
-    def search(session: Session, keyword: str) -> PropertySearchResponse:
+    def search(session: Session, payload: PropertySearchRequest) -> bytes:
+        """Trả về JSON bytes của PropertySearchResponse, lấy từ cache nếu có."""
+
+        # build() bổ sung tag theo property trong kết quả trước khi ghi cache
+        tags = [SEARCH_PROPERTY_TAG]
 
-        cache_key = make_key("search_property", {"keyword": keyword})
-        cached = cache_get(cache_key)
+        def build():
+            properties = PropertySearchRepository.search_properties(
+                session=session,
+                keyword=payload.keyword,
+                limit=payload.limit + 1,
+                offset=payload.offset,
+                sort=payload.sort,
+            )
 
-        if cached:
-            return PropertySearchResponse(results=cached)
+            has_more = len(properties) > payload.limit
+            properties = properties[:payload.limit]
 
+            stats = RatingStatsRepository.get_many(session, [p.id for p in properties])
+            results = [
+                PropertyItem.model_validate(p).model_copy(
+                    update={"rating": RatingStatsRead.from_stats(stats.get(p.id))}
+                )
+                for p in properties
+            ]
 
-        properties = PropertySearchRepository.search_properties(
-            session=session,
-            keyword=keyword
+            tags.extend(property_tag(p.id) for p in properties)
+            return PropertySearchResponse(
+                results=results,
+                next_offset=payload.offset + payload.limit if has_more else None,
+            ).model_dump_json().encode()
+
+        return cache_get_or_build(
+            make_key("search_property_response", {
+                "keyword": payload.keyword.strip().lower(),
+                "limit": payload.limit,
+                "offset": payload.offset,
+                "sort": payload.sort,
+            }),
+            build,
+            soft_ttl=SEARCH_CACHE_SECONDS,
+            hard_ttl=SEARCH_CACHE_SECONDS + SEARCH_STALE_SECONDS,
+            tags=tags,
         )
 
+
+    @staticmethod
+    def _geo_response(session: Session, rows, limit: int, offset: int, tags: list) -> bytes:
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        tags.extend(property_tag(row.id) for row in rows)
+        stats = RatingStatsRepository.get_many(session, [row.id for row in rows])
         results = [
-            PropertyItem.from_orm(p)
-            for p in properties
+            PropertyGeoItem(**row._mapping, rating=RatingStatsRead.from_stats(stats.get(row.id)))
+            for row in rows
         ]
+        return PropertyGeoResponse(
+            results=results,
+            next_offset=offset + limit if has_more else None,
+        ).model_dump_json().encode()
 
+    @staticmethod
+    def search_nearby(session: Session, payload: PropertyNearbyRequest) -> bytes:
+        latitude = round(payload.latitude, GEO_PRECISION)
+        longitude = round(payload.longitude, GEO_PRECISION)
+        tags = [SEARCH_PROPERTY_TAG]
+
+        def build():
+            rows = PropertySearchRepository.search_nearby(
+                session=session,
+                latitude=latitude,
+                longitude=longitude,
+                radius_m=payload.radius_m,
+                limit=payload.limit + 1,
+                offset=payload.offset,
+            )
+            return PropertySearchService._geo_response(
+                session, rows, payload.limit, payload.offset, tags
+            )
 
-        cache_set(cache_key, results, expire_seconds=60 * 10)
+        return cache_get_or_build(
+            make_key("search_nearby", {
+                "lat": latitude,
+                "lng": longitude,
+                "radius_m": payload.radius_m,
+                "limit": payload.limit,
+                "offset": payload.offset,
+            }),
+            build,
+            soft_ttl=GEO_CACHE_SECONDS,
+            tags=tags,
+        )
 
-        return PropertySearchResponse(results=results)
+    @staticmethod
+    def search_viewport(session: Session, payload: PropertyViewportRequest) -> bytes:
+        bounds = {
+            "min_latitude": round(payload.min_latitude, GEO_PRECISION),
+            "min_longitude": round(payload.min_longitude, GEO_PRECISION),
+            "max_latitude": round(payload.max_latitude, GEO_PRECISION),
+            "max_longitude": round(payload.max_longitude, GEO_PRECISION),
+        }
+        tags = [SEARCH_PROPERTY_TAG]
+
+        def build():
+            rows = PropertySearchRepository.search_viewport(
+                session=session,
+                limit=payload.limit + 1,
+                offset=payload.offset,
+                **bounds,
+            )
+            return PropertySearchService._geo_response(
+                session, rows, payload.limit, payload.offset, tags
+            )
+
+        return cache_get_or_build(
+            make_key("search_viewport", {
+                **bounds,
+                "limit": payload.limit,
+                "offset": payload.offset,
+            }),
+            build,
+            soft_ttl=GEO_CACHE_SECONDS,
+            tags=tags,
+        )
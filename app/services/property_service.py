@@ -1,40 +1,58 @@
+import json
+from typing import List, Optional, Tuple
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.repositories.property_repo import PropertyRepository
-from app.repositories.room_type_repo import RoomTypeRepository
-from app.repositories.room_repo import RoomRepository
+from app.repositories.rating_stats_repo import RatingStatsRepository
+from app.repositories.review_repo import ReviewRepository
 
 from app.schemas.property_detail import (
     PropertyDetailRead,
     RoomTypeWithRoomsRead,
     RoomRead,
 )
-from app.schemas.review import ReviewRead
+from app.schemas.property import PropertyRead
+from app.schemas.review import ReviewRead, RatingStatsRead
 
-from app.utils.redis_cache import make_key, cache_get, cache_set
+from app.utils.redis_cache import make_key, cache_get_or_build_async, property_tag
+
+
+DETAIL_CACHE_SECONDS = 60 * 60 * 6
+DETAIL_STALE_SECONDS = 60 * 60
+
+# detail chỉ nhúng vài review mới nhất, phần còn lại qua /reviews/property/{id}
+DETAIL_REVIEW_LIMIT = 5
 
 
 class PropertyService:
 
     @staticmethod
-    def get_detail(session: Session, property_id: int) -> PropertyDetailRead:
-
+    async def get_detail(session: AsyncSession, property_id: int) -> Optional[bytes]:
+        """Trả về JSON bytes của PropertyDetailRead, lấy từ cache nếu có."""
+
+        async def build():
+            result = await PropertyService.build_detail(session, property_id)
+            return result.model_dump_json().encode() if result else None
+
+        return await cache_get_or_build_async(
+            make_key("property_detail", {"id": property_id}),
+            build,
+            soft_ttl=DETAIL_CACHE_SECONDS,
+            hard_ttl=DETAIL_CACHE_SECONDS + DETAIL_STALE_SECONDS,
+            tags=[property_tag(property_id)],
+        )
 
-        cache_key = make_key("property_detail", {"id": property_id})
-        cached = cache_get(cache_key)
-        if cached:
-            return PropertyDetailRead(**cached)
 
+    @staticmethod
+    async def build_detail(session: AsyncSession, property_id: int) -> Optional[PropertyDetailRead]:
 
-        property_obj = PropertyRepository.get_by_id(session, property_id)
+        property_obj = await PropertyRepository.get_detail(session, property_id)
         if not property_obj:
             return None
 
 
-        room_types = RoomTypeRepository.get_by_property(session, property_id)
-
         room_type_list = []
-        for rt in room_types:
-            rooms = RoomRepository.get_by_room_type(session, rt.id)
+        for rt in sorted(property_obj.room_types, key=lambda x: x.id):
             room_type_list.append(
                 RoomTypeWithRoomsRead(
                     id=rt.id,
@@ -44,15 +62,24 @@ class PropertyService:
                     is_active=rt.is_active,
                     rooms=[
                         RoomRead.from_orm(r)
-                        for r in rooms
+                        for r in sorted(rt.rooms, key=lambda x: x.id)
                     ]
                 )
             )
 
 
+        review_rows = await ReviewRepository.get_page_async(
+            session, property_id, sort="newest", limit=DETAIL_REVIEW_LIMIT
+        )
         review_list = [
-            ReviewRead.from_orm(rv)
-            for rv in property_obj.reviews
+            ReviewRead(
+                id=rv.id,
+                user_id=rv.user_id,
+                rating=rv.rating,
+                description=rv.description,
+                user_name=user.full_name or user.email,
+            )
+            for rv, user in review_rows
         ]
 
 
@@ -69,14 +96,42 @@ class PropertyService:
             contact=property_obj.contact,
             room_types=room_type_list,
             reviews=review_list,           # 🔥 THÊM DÒNG NÀY
+            rating=RatingStatsRead.from_stats(
+                await RatingStatsRepository.get_async(session, property_id)
+            ),
         )
 
-
-        cache_set(cache_key, result.model_dump(), expire_seconds=120)
-
         return result
 
 
     @staticmethod
-    def list_properties(session: Session):
-        return PropertyRepository.get_all(session)
+    def list_properties(
+        session: Session,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ) -> Tuple[bytes, Optional[int]]:
+        """Trả về (JSON bytes của trang, cursor trang sau)."""
+
+        fields = fields or list(PropertyRead.model_fields)
+        if "id" not in fields:
+            fields = ["id"] + fields
+
+        # rating không phải cột của property, lấy từ property_rating_stats
+        with_rating = "rating" in fields
+        columns = [f for f in fields if f != "rating"]
+
+        rows = PropertyRepository.get_page(session, columns, limit + 1, cursor)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        items = [dict(zip(columns, row)) for row in rows]
+        next_cursor = items[-1]["id"] if has_more else None
+
+        if with_rating:
+            stats = RatingStatsRepository.get_many(session, [item["id"] for item in items])
+            for item in items:
+                item["rating"] = RatingStatsRead.from_stats(stats.get(item["id"])).model_dump()
+
+        return json.dumps(items, ensure_ascii=False).encode(), next_cursor
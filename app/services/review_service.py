@@ -1,6 +1,8 @@
+from typing import List, Optional, Tuple
 from sqlmodel import Session
 from app.models.review import Review
-from app.repositories.review_repo import ReviewRepository
+from app.repositories.review_repo import ReviewRepository, REVIEW_SORTS
+from app.repositories.rating_stats_repo import RatingStatsRepository
 from app.schemas.review import ReviewCreate, ReviewRead
 
 
@@ -15,6 +17,10 @@ class ReviewService:
             description=data.description
         )
         created = ReviewRepository.create(session, review)
+        RatingStatsRepository.apply(session, created.property_id, created.rating, 1)
+        session.commit()
+        session.refresh(created)
+
         return ReviewRead(
             id=created.id,
             user_id=created.user_id,
@@ -23,21 +29,52 @@ class ReviewService:
         )
 
     @staticmethod
-    def get_reviews_for_property(session: Session, property_id: int):
-        rows = ReviewRepository.get_by_property(session, property_id)
-
-        results = []
-        for review, user in rows:
-            results.append(
-                ReviewRead(
-                    id=review.id,
-                    user_id=review.user_id,
-                    rating=review.rating,
-                    description=review.description,
-                    user_name=user.full_name or user.email
-                )
-            )
-        return results
+    def to_read(review, user) -> ReviewRead:
+        return ReviewRead(
+            id=review.id,
+            user_id=review.user_id,
+            rating=review.rating,
+            description=review.description,
+            user_name=user.full_name or user.email
+        )
+
+    @staticmethod
+    def encode_cursor(review, sort: str) -> str:
+        return str(review.id) if sort == "newest" else f"{review.rating}:{review.id}"
+
+    @staticmethod
+    def decode_cursor(cursor: Optional[str], sort: str) -> Optional[Tuple[int, ...]]:
+        if cursor is None:
+            return None
+        try:
+            parts = tuple(int(p) for p in cursor.split(":"))
+        except ValueError:
+            raise ValueError("Cursor không hợp lệ")
+        if len(parts) != (1 if sort == "newest" else 2):
+            raise ValueError("Cursor không hợp lệ")
+        return parts
+
+    @staticmethod
+    def get_review_page(
+        session: Session,
+        property_id: int,
+        sort: str = "newest",
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[ReviewRead], Optional[str]]:
+        """Trả về (1 trang review, cursor trang sau)."""
+        if sort not in REVIEW_SORTS:
+            raise ValueError("Sort không hợp lệ")
+
+        rows = ReviewRepository.get_page(
+            session, property_id, sort, limit + 1, ReviewService.decode_cursor(cursor, sort)
+        )
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = ReviewService.encode_cursor(rows[-1][0], sort) if has_more else None
+        return [ReviewService.to_read(review, user) for review, user in rows], next_cursor
 
     @staticmethod
     def delete_review(session: Session, review_id: int):
@@ -46,5 +83,7 @@ class ReviewService:
             raise Exception("Review không tồn tại")
 
         ReviewRepository.delete(session, review)
+        RatingStatsRepository.apply(session, review.property_id, review.rating, -1)
+        session.commit()
         return True
 
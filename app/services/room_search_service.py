@@ -0,0 +1,118 @@
+from typing import Optional
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from app.models.property import Property
+from app.models.property_amenity import PropertyAmenity
+from app.models.room_type import RoomType
+from app.repositories.availability_repo import AvailabilityRepository
+from app.repositories.inventory_repo import InventoryRepository
+from app.schemas.room_search import (
+    RoomSearchRequest,
+    RoomSearchResponse,
+    AvailableRoomType,
+    AvailableRoom,
+)
+from app.utils.redis_cache import make_key, cache_get_or_build, property_tag
+
+
+class RoomSearchService:
+
+    @staticmethod
+    def _cache_payload(payload: RoomSearchRequest) -> dict:
+        return {
+            "property_id": payload.property_id,
+            "checkin": payload.checkin.isoformat(),
+            "checkout": payload.checkout.isoformat(),
+            "num_guests": payload.num_guests,
+            "min_price": payload.min_price,
+            "max_price": payload.max_price,
+            "amenities": sorted(set(payload.amenities or [])),
+        }
+
+    @staticmethod
+    def search(session: Session, payload: RoomSearchRequest) -> Optional[bytes]:
+        """Trả về JSON bytes của RoomSearchResponse, lấy từ cache nếu có."""
+
+        def build():
+            response = RoomSearchService.build(session, payload)
+            return response.model_dump_json().encode() if response else None
+
+        return cache_get_or_build(
+            make_key("search_rooms", RoomSearchService._cache_payload(payload)),
+            build,
+            soft_ttl=30,
+            tags=[property_tag(payload.property_id)],
+        )
+
+    @staticmethod
+    def build(session: Session, payload: RoomSearchRequest) -> Optional[RoomSearchResponse]:
+
+        property_obj = session.get(Property, payload.property_id)
+        if not property_obj or not property_obj.is_active:
+            return None
+
+        response = RoomSearchResponse(
+            property_id=payload.property_id,
+            checkin=payload.checkin,
+            checkout=payload.checkout,
+            room_types=[],
+        )
+
+
+        amenity_ids = set(payload.amenities or [])
+        if amenity_ids:
+            matched = session.exec(
+                select(func.count(func.distinct(PropertyAmenity.amenity_id)))
+                .where(PropertyAmenity.property_id == payload.property_id)
+                .where(PropertyAmenity.amenity_id.in_(amenity_ids))
+            ).one()
+            if matched < len(amenity_ids):
+                return response
+
+
+        stmt = (
+            select(RoomType)
+            .where(RoomType.property_id == payload.property_id)
+            .where(RoomType.is_active == True)
+            .where(RoomType.max_occupancy >= payload.num_guests)
+        )
+        if payload.min_price is not None:
+            stmt = stmt.where(RoomType.price >= payload.min_price)
+        if payload.max_price is not None:
+            stmt = stmt.where(RoomType.price <= payload.max_price)
+
+        room_types = session.exec(stmt.order_by(RoomType.price, RoomType.id)).all()
+
+
+        # inventory theo đêm loại sớm các loại phòng đã hết, khỏi quét booked_room
+        free = InventoryRepository.get_free_counts(
+            session, [rt.id for rt in room_types], payload.checkin, payload.checkout
+        )
+        rooms = AvailabilityRepository.get_available_rooms(
+            session,
+            [rt.id for rt in room_types if free.get(rt.id, 0) > 0],
+            payload.checkin,
+            payload.checkout,
+        )
+
+        rooms_by_type = {}
+        for room in rooms:
+            rooms_by_type.setdefault(room.room_type_id, []).append(
+                AvailableRoom(room_id=room.id, room_number=room.name)
+            )
+
+        for rt in room_types:
+            available = rooms_by_type.get(rt.id, [])
+            response.room_types.append(
+                AvailableRoomType(
+                    id=rt.id,
+                    name=rt.name,
+                    price=rt.price,
+                    max_occupancy=rt.max_occupancy,
+                    room_count=len(available),
+                    available_rooms=available,
+                )
+            )
+
+        return response
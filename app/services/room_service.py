@@ -1,5 +1,5 @@
 from sqlmodel import Session
-from app.repositories.room_repo import RoomRepository
+from app.repositories.availability_repo import AvailabilityRepository
 from app.repositories.room_type_repo import RoomTypeRepository
 from app.schemas.room import RoomRead
 
@@ -15,12 +15,8 @@ class RoomService:
             raise Exception("Room type không tồn tại")
 
 
-        rooms = RoomRepository.get_by_room_type(session, room_type_id)
+        rooms = AvailabilityRepository.get_available_rooms(
+            session, [room_type_id], checkin, checkout
+        )
 
-
-        available_rooms = []
-        for room in rooms:
-            if RoomRepository.is_available(session, room.id, checkin, checkout):
-                available_rooms.append(RoomRead.from_orm(room))
-
-        return available_rooms
+        return [RoomRead.from_orm(room) for room in rooms]
@@ -0,0 +1,70 @@
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.property import Property
+from app.models.property_amenity import PropertyAmenity
+from app.models.review import Review
+from app.models.room import Room
+from app.models.room_type import RoomType
+from app.utils.redis_cache import property_tag, invalidate_tags, SEARCH_PROPERTY_TAG
+
+
+_PENDING_KEY = "cache_tags"
+
+
+def _tags_for(session: Session, obj) -> set:
+    if isinstance(obj, Property):
+        return {property_tag(obj.id), SEARCH_PROPERTY_TAG}
+
+    if isinstance(obj, (RoomType, Review, PropertyAmenity)):
+        return {property_tag(obj.property_id)}
+
+    if isinstance(obj, Room):
+        with session.no_autoflush:
+            room_type = session.get(RoomType, obj.room_type_id)
+        return {property_tag(room_type.property_id)} if room_type else set()
+
+    return set()
+
+
+def _collect_tags(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, set())
+
+    for obj in list(session.new) + list(session.deleted):
+        pending.update(_tags_for(session, obj))
+
+    for obj in session.dirty:
+        if session.is_modified(obj, include_collections=False):
+            pending.update(_tags_for(session, obj))
+
+
+def _purge_tags(session: Session) -> None:
+    tags = session.info.pop(_PENDING_KEY, None)
+    if not tags:
+        return
+
+    purged = invalidate_tags(*tags)
+    logger.info(f"[Cache] invalidated {purged} keys for {sorted(tags)}")
+
+    # request đọc replica ngay sau commit có thể cache lại dữ liệu cũ -> xoá lần 2
+    if settings.replica_urls:
+        timer = threading.Timer(settings.DB_REPLICA_MAX_LAG_SECONDS, invalidate_tags, args=tags)
+        timer.daemon = True
+        timer.start()
+
+
+def _discard_tags(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_cache_invalidation() -> None:
+    if event.contains(Session, "after_flush", _collect_tags):
+        return
+
+    event.listen(Session, "after_flush", _collect_tags)
+    event.listen(Session, "after_commit", _purge_tags)
+    event.listen(Session, "after_rollback", _discard_tags)
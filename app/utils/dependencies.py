@@ -6,29 +6,28 @@ from jose import jwt, JWTError
 from app.core.config import settings
 from app.core.database import get_session
 from app.models.user import User
+from app.schemas.auth import AuthUser
 from app.utils.enums import UserRole
+from app.utils.token_revocation import is_token_revoked
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
-):
+def _decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid token format")
 
-        user_id: str = payload.get("sub")
-        role: str = payload.get("role")
+    if payload.get("scope") != "access" or not payload.get("sub") or not payload.get("role"):
+        raise HTTPException(status_code=401, detail="Invalid token payload")
 
-        if not user_id or not role:
-            raise HTTPException(status_code=401, detail="Invalid token payload")
+    return payload
 
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token format")
 
-    user = session.get(User, int(user_id))
+def _load_active_user(session: Session, user_id: int) -> User:
+    user = session.get(User, user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -39,19 +38,50 @@ def get_current_user(
     return user
 
 
-def require_super_admin(user: User = Depends(get_current_user)):
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_session)
+):
+    """User đầy đủ từ DB — chỉ dùng khi thật sự cần entity (sửa profile...)."""
+    payload = _decode_access_token(token)
+    return _load_active_user(session, int(payload["sub"]))
+
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_session)
+) -> AuthUser:
+    """id/role/property_id từ claim; DB chỉ bị chạm khi tắt AUTH_STATELESS hoặc Redis lỗi.
+
+    Session mở lazy nên không tốn kết nối nếu không query.
+    """
+    payload = _decode_access_token(token)
+    user_id = int(payload["sub"])
+
+    if settings.AUTH_STATELESS:
+        revoked = is_token_revoked(user_id, payload.get("iat", 0))
+        if revoked:
+            raise HTTPException(status_code=401, detail="Token revoked")
+        if revoked is False:
+            return AuthUser(id=user_id, role=payload["role"], property_id=payload.get("pid"))
+
+    user = _load_active_user(session, user_id)
+    return AuthUser(id=user.id, role=user.role, property_id=user.property_id)
+
+
+def require_super_admin(user: AuthUser = Depends(get_current_principal)):
     if user.role != UserRole.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Super admin only")
     return user
 
 
-def require_staff(user: User = Depends(get_current_user)):
+def require_staff(user: AuthUser = Depends(get_current_principal)):
     if user.role not in (UserRole.STAFF, UserRole.SUPER_ADMIN):
         raise HTTPException(status_code=403, detail="Staff only")
     return user
 
 
-def require_customer(user: User = Depends(get_current_user)):
+def require_customer(user: AuthUser = Depends(get_current_principal)):
     if user.role != UserRole.CUSTOMER:
         raise HTTPException(status_code=403, detail="Customer only")
     return user
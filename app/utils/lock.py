@@ -1,4 +1,9 @@
+import time
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
 import redis
+import redis.asyncio as aioredis
 from app.core.config import settings
 
 r = redis.Redis(
@@ -8,15 +13,157 @@ r = redis.Redis(
     decode_responses=True
 )
 
-LOCK_EXPIRE = 60 * 15
+ar = aioredis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=2,
+    decode_responses=True
+)
+
+# Mỗi phòng mỗi tháng là 1 hash: hold:room:{room_id}:{YYYY-MM}
+#   field = đêm (YYYY-MM-DD), value = "{token}|{hết hạn, epoch ms}"
+# Hai kỳ lưu trú giao nhau (1–3 và 2–4) sẽ đụng nhau ở đêm chung.
+
+# KEYS[i] đi cặp với ARGV[2 + i] (field của đêm đó).
+# ARGV[1] = token, ARGV[2] = thời gian giữ (ms).
+# Trả về 0 nếu giữ được tất cả, ngược lại là vị trí (1-based) của đêm bị đụng.
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local token = ARGV[1]
+local ttl = tonumber(ARGV[2])
+
+for i, key in ipairs(KEYS) do
+    local v = redis.call('HGET', key, ARGV[2 + i])
+    if v then
+        local sep = string.find(v, '|', 1, true)
+        local owner = string.sub(v, 1, sep - 1)
+        local exp = tonumber(string.sub(v, sep + 1))
+        if exp > now and owner ~= token then
+            return i
+        end
+    end
+end
+
+local value = token .. '|' .. (now + ttl)
+local key_ttl = math.ceil(ttl / 1000) + 60
+for i, key in ipairs(KEYS) do
+    redis.call('HSET', key, ARGV[2 + i], value)
+    redis.call('EXPIRE', key, key_ttl, 'NX')
+    redis.call('EXPIRE', key, key_ttl, 'GT')
+end
+return 0
+"""
+
+# Chỉ xoá những đêm do chính token này giữ.
+_RELEASE_SCRIPT = """
+local prefix = ARGV[1] .. '|'
+local released = 0
+for i, key in ipairs(KEYS) do
+    local v = redis.call('HGET', key, ARGV[1 + i])
+    if v and string.sub(v, 1, #prefix) == prefix then
+        redis.call('HDEL', key, ARGV[1 + i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+_acquire = r.register_script(_ACQUIRE_SCRIPT)
+_release = r.register_script(_RELEASE_SCRIPT)
+_acquire_async = ar.register_script(_ACQUIRE_SCRIPT)
+_release_async = ar.register_script(_RELEASE_SCRIPT)
+
+
+def hold_token(booking_id: int) -> str:
+    return f"booking:{booking_id}"
+
+def _nights(checkin: date, checkout: date) -> List[date]:
+    return [checkin + timedelta(days=i) for i in range((checkout - checkin).days)]
+
+def _hold_entries(room_ids: Iterable[int], checkin: date, checkout: date) -> List[Tuple[int, str, str]]:
+    """(room_id, key, field) cho từng phòng x từng đêm."""
+    return [
+        (rid, f"hold:room:{rid}:{night:%Y-%m}", night.isoformat())
+        for rid in room_ids
+        for night in _nights(checkin, checkout)
+    ]
+
+def _script_args(token: str, entries, *extra):
+    return [e[1] for e in entries], [token, *extra, *[e[2] for e in entries]]
+
+def _conflict(entries, result: int) -> Optional[int]:
+    return entries[result - 1][0] if result else None
+
+
+def acquire_room_holds(booking_id: int, room_ids: Iterable[int], checkin: date, checkout: date,
+                       ttl_seconds: float) -> Optional[int]:
+    """Giữ nguyên tử mọi đêm của các phòng. Trả về None nếu thành công, hoặc id phòng bị đụng."""
+    entries = _hold_entries(room_ids, checkin, checkout)
+    if not entries:
+        return None
+    keys, args = _script_args(hold_token(booking_id), entries, max(int(ttl_seconds * 1000), 1))
+    return _conflict(entries, _acquire(keys=keys, args=args))
+
+def release_room_holds(booking_id: int, room_ids: Iterable[int], checkin: date, checkout: date) -> int:
+    entries = _hold_entries(room_ids, checkin, checkout)
+    if not entries:
+        return 0
+    keys, args = _script_args(hold_token(booking_id), entries)
+    return _release(keys=keys, args=args)
+
+def release_many_room_holds(bookings: Iterable[Tuple[int, Iterable[int], date, date]]) -> int:
+    """Nhả hold của nhiều booking (booking_id, room_ids, checkin, checkout) trong 1 pipeline."""
+    pipe = r.pipeline(transaction=False)
+    queued = 0
+    for booking_id, room_ids, checkin, checkout in bookings:
+        entries = _hold_entries(room_ids, checkin, checkout)
+        if not entries:
+            continue
+        keys, args = _script_args(hold_token(booking_id), entries)
+        _release(keys=keys, args=args, client=pipe)
+        queued += 1
+    return sum(pipe.execute()) if queued else 0
+
+async def acquire_room_holds_async(booking_id: int, room_ids: Iterable[int], checkin: date, checkout: date,
+                                   ttl_seconds: float) -> Optional[int]:
+    entries = _hold_entries(room_ids, checkin, checkout)
+    if not entries:
+        return None
+    keys, args = _script_args(hold_token(booking_id), entries, max(int(ttl_seconds * 1000), 1))
+    return _conflict(entries, await _acquire_async(keys=keys, args=args))
+
+async def release_room_holds_async(booking_id: int, room_ids: Iterable[int], checkin: date, checkout: date) -> int:
+    entries = _hold_entries(room_ids, checkin, checkout)
+    if not entries:
+        return 0
+    keys, args = _script_args(hold_token(booking_id), entries)
+    return await _release_async(keys=keys, args=args)
+
+
+def get_held_room_ids(room_ids: Iterable[int], checkin: date, checkout: date) -> Set[int]:
+    """Đọc hàng loạt (1 round trip) các phòng đang có đêm bị giữ trong [checkin, checkout)."""
+    grouped = {}
+    for rid, key, field in _hold_entries(room_ids, checkin, checkout):
+        grouped.setdefault((rid, key), []).append(field)
+    if not grouped:
+        return set()
 
-def make_lock_key(room_id: int, checkin, checkout):
-    return f"lock:room:{room_id}:{checkin}:{checkout}"
+    pipe = r.pipeline(transaction=False)
+    for (_, key), fields in grouped.items():
+        pipe.hmget(key, fields)
 
-def acquire_room_lock(room_id: int, checkin, checkout) -> bool:
-    key = make_lock_key(room_id, checkin, checkout)
-    return r.set(key, "1", nx=True, ex=LOCK_EXPIRE)
+    try:
+        results = pipe.execute()
+    except redis.RedisError:
+        # đọc để lọc hiển thị; DB vẫn là nguồn chính nên bỏ qua khi Redis lỗi
+        return set()
 
-def release_room_lock(room_id: int, checkin, checkout):
-    key = make_lock_key(room_id, checkin, checkout)
-    r.delete(key)
+    now_ms = int(time.time() * 1000)
+    held = set()
+    for (rid, _), values in zip(grouped, results):
+        for v in values:
+            if v and int(v.rsplit("|", 1)[1]) > now_ms:
+                held.add(rid)
+                break
+    return held
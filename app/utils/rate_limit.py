@@ -0,0 +1,64 @@
+import uuid
+from contextlib import asynccontextmanager
+
+import redis
+import redis.asyncio as aioredis
+from fastapi import HTTPException, status
+from app.core.config import settings
+
+ar = aioredis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=3,
+    decode_responses=True
+)
+
+# Semaphore trong Redis, dùng chung giữa mọi process API: mỗi người giữ slot là 1 member của
+# sorted set, score = hạn chót (ms). Slot của process chết giữa chừng tự bị loại khi quá hạn,
+# kể cả khi key liên tục có request mới; trả slot bằng ZREM nên không bao giờ làm âm bộ đếm.
+# ARGV[1] = limit, ARGV[2] = TTL slot (ms), ARGV[3] = token của người giữ
+_ACQUIRE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[2]), ARGV[3])
+redis.call('PEXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+_acquire = ar.register_script(_ACQUIRE_SCRIPT)
+
+SLOT_TTL_SECONDS = 30
+
+
+def _too_many() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many concurrent attempts, please retry"
+    )
+
+
+@asynccontextmanager
+async def concurrency_slots_async(*limits):
+    """Giữ 1 slot cho mỗi (key, limit); hết slot thì 429. Redis lỗi thì cho qua."""
+    token = uuid.uuid4().hex
+    held = []
+    try:
+        for key, limit in limits:
+            try:
+                ok = await _acquire(keys=[key], args=[limit, SLOT_TTL_SECONDS * 1000, token])
+            except redis.RedisError:
+                continue
+            if not ok:
+                raise _too_many()
+            held.append(key)
+        yield
+    finally:
+        for key in held:
+            try:
+                await ar.zrem(key, token)
+            except redis.RedisError:
+                pass
@@ -1,6 +1,14 @@
 import json
+import time
 import hashlib
+import uuid
+import threading
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+import asyncio
 import redis
+import redis.asyncio as aioredis
 from redis.exceptions import ConnectionError
 from app.core.config import settings
 
@@ -22,6 +30,87 @@ def create_redis_client():
 
 r = create_redis_client()
 
+# client async dùng chung db với r, cho các router async
+ar = aioredis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=1,
+    decode_responses=True,
+) if r else None
+
+
+
+class LocalCache:
+    """LRU trong process, lưu sẵn bytes JSON để trả thẳng ra response."""
+
+    def __init__(self, max_items: int, ttl_seconds: int):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+
+            expires_at, raw = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return raw
+
+    def set(self, key: str, raw: bytes, ttl_seconds: Optional[int] = None):
+        if self.max_items <= 0:
+            return
+
+        ttl = min(ttl_seconds or self.ttl_seconds, self.ttl_seconds)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, raw)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+local_cache = LocalCache(
+    max_items=settings.CACHE_LOCAL_MAX_ITEMS,
+    ttl_seconds=settings.CACHE_LOCAL_TTL_SECONDS,
+)
+
+_redis_stats = {"hits": 0, "misses": 0}
+_redis_stats_lock = threading.Lock()
+
+
+def _count(stat: str) -> None:
+    # gọi từ nhiều thread của threadpool: += trên dict không nguyên tử
+    with _redis_stats_lock:
+        _redis_stats[stat] += 1
+
 
 
 def make_key(prefix: str, payload: dict):
@@ -32,24 +121,371 @@ def make_key(prefix: str, payload: dict):
 
 
 
-def cache_get(key: str):
+def cache_get_bytes(key: str) -> Optional[bytes]:
+    raw = local_cache.get(key)
+    if raw is not None:
+        return raw
+
     if not r:
         return None
 
     try:
-        raw = r.get(key)
-        if raw:
-            return json.loads(raw)
-        return None
+        pipe = r.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        value, ttl = pipe.execute()
     except ConnectionError:
         return None
 
+    if not value:
+        _count("misses")
+        return None
+
+    _count("hits")
+    raw = value.encode()
+    local_cache.set(key, raw, ttl if ttl and ttl > 0 else None)
+    return raw
+
+
+
+def cache_get(key: str):
+    raw = cache_get_bytes(key)
+    if raw:
+        return json.loads(raw)
+    return None
+
+
+
+def property_tag(property_id: int) -> str:
+    return f"tag:property:{property_id}"
+
+
+SEARCH_PROPERTY_TAG = "tag:search_property"
+
+
+
+def _fresh_key(key: str) -> str:
+    return f"fresh:{key}"
+
+
+def _rebuild_lock_key(key: str) -> str:
+    return f"rebuild:{key}"
+
+
+def _purged_key(tag: str) -> str:
+    return f"purged:{tag}"
+
+
+# invalidate_tags ghi thời điểm purge (giờ của Redis, micro giây) cho từng tag. Bản build chỉ
+# được ghi nếu không tag nào bị purge kể từ lúc bắt đầu build, tránh ghi lại dữ liệu đọc
+# trước commit sau khi đã purge. Dùng thời điểm thay cho bộ đếm vì search() chỉ biết hết
+# tag (theo property) sau khi build xong.
+_MARK_PURGED_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+for i = 1, #KEYS do
+    redis.call('SET', KEYS[i], now, 'EX', ARGV[1])
+end
+return now
+"""
+
+# KEYS = key, fresh_key, tag1..tagN, purged1..purgedN
+# ARGV = raw, expire, soft_expire (0 = không có), N, thời điểm bắt đầu build
+_SET_IF_NOT_PURGED_SCRIPT = """
+local n = tonumber(ARGV[4])
+local started = tonumber(ARGV[5])
+for i = 1, n do
+    local purged = redis.call('GET', KEYS[2 + n + i])
+    if purged and tonumber(purged) >= started then
+        return 0
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+end
+for i = 1, n do
+    redis.call('SADD', KEYS[2 + i], KEYS[1])
+    if redis.call('TTL', KEYS[2 + i]) < tonumber(ARGV[2]) then
+        redis.call('EXPIRE', KEYS[2 + i], ARGV[2])
+    end
+end
+return 1
+"""
+
+# chỉ cần sống lâu hơn 1 lần build
+PURGED_MARK_SECONDS = 300
+
+
+def _redis_micros(now) -> int:
+    seconds, micros = now
+    return int(seconds) * 1_000_000 + int(micros)
+
+
+def _set_if_not_purged_args(key: str, raw: bytes, expire_seconds: int, soft_expire_seconds: int, tags, started: int):
+    keys = [key, _fresh_key(key), *tags, *[_purged_key(tag) for tag in tags]]
+    args = [raw, expire_seconds, soft_expire_seconds or 0, len(tags), started]
+    return keys, args
+
+
+
+def cache_set_bytes(
+    key: str,
+    raw: bytes,
+    expire_seconds: int = 30,
+    tags=None,
+    soft_expire_seconds: Optional[int] = None,
+):
+    local_cache.set(key, raw, soft_expire_seconds or expire_seconds)
+
+    if not r:
+        return False
+
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.set(key, raw, ex=expire_seconds)
+        if soft_expire_seconds:
+            pipe.set(_fresh_key(key), "1", ex=soft_expire_seconds)
+        for tag in tags or []:
+            pipe.sadd(tag, key)
+            # tag sống ít nhất bằng key lâu nhất trong nó
+            pipe.expire(tag, expire_seconds, nx=True)
+            pipe.expire(tag, expire_seconds, gt=True)
+        pipe.execute()
+        return True
+    except ConnectionError:
+        return False
+
+
+
+REBUILD_LOCK_SECONDS = 10
+REBUILD_WAIT_SECONDS = 2.0
+REBUILD_POLL_SECONDS = 0.05
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _try_rebuild_lock(key: str) -> Optional[str]:
+    token = uuid.uuid4().hex
+    try:
+        if r.set(_rebuild_lock_key(key), token, nx=True, ex=REBUILD_LOCK_SECONDS):
+            return token
+    except ConnectionError:
+        pass
+    return None
+
+
+def _release_rebuild_lock(key: str, token: str):
+    try:
+        r.eval(_RELEASE_LOCK_SCRIPT, 1, _rebuild_lock_key(key), token)
+    except ConnectionError:
+        pass
+
+
+def cache_get_or_build(
+    key: str,
+    build: Callable[[], Optional[bytes]],
+    soft_ttl: int,
+    hard_ttl: Optional[int] = None,
+    tags=None,
+) -> Optional[bytes]:
+    """
+    Stale-while-revalidate + single-flight:
+    - còn soft TTL: trả cache
+    - quá soft TTL nhưng chưa quá hard TTL: 1 worker build lại, các worker khác nhận bản cũ
+    - mất hẳn: 1 worker build, các worker khác chờ tối đa REBUILD_WAIT_SECONDS
+    """
+    hard_ttl = max(hard_ttl or soft_ttl, soft_ttl)
 
+    raw = local_cache.get(key)
+    if raw is not None:
+        return raw
 
-def cache_set(key: str, value: dict, expire_seconds: int = 30):
     if not r:
+        return build()
+
+    def rebuild(token: str) -> Optional[bytes]:
+        try:
+            try:
+                started = _redis_micros(r.time())
+            except ConnectionError:
+                return build()
+            fresh = build()
+            if fresh is not None:
+                # tags có thể được build() bổ sung nên đọc sau khi build
+                keys, args = _set_if_not_purged_args(
+                    key, fresh, hard_ttl, soft_ttl, list(tags or []), started
+                )
+                try:
+                    if r.eval(_SET_IF_NOT_PURGED_SCRIPT, len(keys), *keys, *args):
+                        local_cache.set(key, fresh, soft_ttl)
+                except ConnectionError:
+                    pass
+            return fresh
+        finally:
+            _release_rebuild_lock(key, token)
+
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.exists(_fresh_key(key))
+        value, is_fresh = pipe.execute()
+    except ConnectionError:
+        return build()
+
+    if value:
+        _count("hits")
+        stale = value.encode()
+        if is_fresh:
+            local_cache.set(key, stale)
+            return stale
+
+        token = _try_rebuild_lock(key)
+        if not token:
+            return stale
+        return rebuild(token)
+
+    _count("misses")
+    token = _try_rebuild_lock(key)
+    if token:
+        return rebuild(token)
+
+    deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_SECONDS)
+        try:
+            value = r.get(key)
+        except ConnectionError:
+            break
+        if value:
+            return value.encode()
+
+    return build()
+
+
+
+async def cache_set_bytes_async(
+    key: str,
+    raw: bytes,
+    expire_seconds: int = 30,
+    tags=None,
+    soft_expire_seconds: Optional[int] = None,
+):
+    local_cache.set(key, raw, soft_expire_seconds or expire_seconds)
+
+    if not ar:
         return False
 
+    try:
+        pipe = ar.pipeline(transaction=False)
+        pipe.set(key, raw, ex=expire_seconds)
+        if soft_expire_seconds:
+            pipe.set(_fresh_key(key), "1", ex=soft_expire_seconds)
+        for tag in tags or []:
+            pipe.sadd(tag, key)
+            pipe.expire(tag, expire_seconds, nx=True)
+            pipe.expire(tag, expire_seconds, gt=True)
+        await pipe.execute()
+        return True
+    except ConnectionError:
+        return False
+
+
+async def cache_get_or_build_async(
+    key: str,
+    build: Callable[[], Awaitable[Optional[bytes]]],
+    soft_ttl: int,
+    hard_ttl: Optional[int] = None,
+    tags=None,
+) -> Optional[bytes]:
+    """Bản async của cache_get_or_build, dùng chung local cache và key fresh/rebuild."""
+    hard_ttl = max(hard_ttl or soft_ttl, soft_ttl)
+
+    raw = local_cache.get(key)
+    if raw is not None:
+        return raw
+
+    if not ar:
+        return await build()
+
+    async def try_lock() -> Optional[str]:
+        token = uuid.uuid4().hex
+        try:
+            if await ar.set(_rebuild_lock_key(key), token, nx=True, ex=REBUILD_LOCK_SECONDS):
+                return token
+        except ConnectionError:
+            pass
+        return None
+
+    async def rebuild(token: str) -> Optional[bytes]:
+        try:
+            try:
+                started = _redis_micros(await ar.time())
+            except ConnectionError:
+                return await build()
+            fresh = await build()
+            if fresh is not None:
+                keys, args = _set_if_not_purged_args(
+                    key, fresh, hard_ttl, soft_ttl, list(tags or []), started
+                )
+                try:
+                    if await ar.eval(_SET_IF_NOT_PURGED_SCRIPT, len(keys), *keys, *args):
+                        local_cache.set(key, fresh, soft_ttl)
+                except ConnectionError:
+                    pass
+            return fresh
+        finally:
+            try:
+                await ar.eval(_RELEASE_LOCK_SCRIPT, 1, _rebuild_lock_key(key), token)
+            except ConnectionError:
+                pass
+
+    try:
+        pipe = ar.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.exists(_fresh_key(key))
+        value, is_fresh = await pipe.execute()
+    except ConnectionError:
+        return await build()
+
+    if value:
+        _count("hits")
+        stale = value.encode()
+        if is_fresh:
+            local_cache.set(key, stale)
+            return stale
+
+        token = await try_lock()
+        if not token:
+            return stale
+        return await rebuild(token)
+
+    _count("misses")
+    token = await try_lock()
+    if token:
+        return await rebuild(token)
+
+    deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(REBUILD_POLL_SECONDS)
+        try:
+            value = await ar.get(key)
+        except ConnectionError:
+            break
+        if value:
+            return value.encode()
+
+    return await build()
+
+
+
+def cache_set(key: str, value: dict, expire_seconds: int = 30, tags=None):
+
     def default_serializer(obj):
 
         if hasattr(obj, "model_dump"):
@@ -59,9 +495,118 @@ def cache_set(key: str, value: dict, expire_seconds: int = 30):
             return obj.dict()
         return str(obj)
 
+    raw = json.dumps(value, default=default_serializer).encode()
+    return cache_set_bytes(key, raw, expire_seconds=expire_seconds, tags=tags)
+
+
+
+def invalidate_tags(*tags: str) -> int:
+    if not r or not tags:
+        return 0
+
     try:
-        r.set(key, json.dumps(value, default=default_serializer), ex=expire_seconds)
-        return True
+        # đánh dấu trước khi xóa: bản build đang chạy dở sẽ không ghi lại dữ liệu cũ
+        r.eval(
+            _MARK_PURGED_SCRIPT,
+            len(tags),
+            *[_purged_key(tag) for tag in tags],
+            PURGED_MARK_SECONDS,
+        )
+
+        pipe = r.pipeline(transaction=False)
+        for tag in tags:
+            pipe.smembers(tag)
+        keys = set()
+        for members in pipe.execute():
+            keys.update(members)
+
+        r.delete(*keys, *tags)
+        local_cache.pop(*keys)
+        return len(keys)
     except ConnectionError:
-        return False
+        return 0
+
+
+
+def cache_stats() -> dict:
+    with _redis_stats_lock:
+        redis_stats = dict(_redis_stats)
+    if r:
+        try:
+            redis_stats["evictions"] = r.info("stats").get("evicted_keys", 0)
+        except ConnectionError:
+            pass
+
+    return {"local": local_cache.stats(), "redis": redis_stats}
 
+
+
+# Histogram độ trễ hết hạn -> xử lý (ms). Field lag_le_{b}: số booking có độ trễ trong (b trước, b];
+# lag_gt_{b cuối}: lớn hơn bucket cuối.
+LAG_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10_000, 30_000, 60_000, 300_000)
+LAG_QUANTILES = (50, 95, 99)
+
+
+def _lag_field(lag_ms: float) -> str:
+    for bound in LAG_BUCKETS_MS:
+        if lag_ms <= bound:
+            return f"lag_le_{bound}"
+    return f"lag_gt_{LAG_BUCKETS_MS[-1]}"
+
+
+def record_job_run(job: str, rows: int, seconds: float, lags: Iterable[float] = ()) -> None:
+    """Ghi số dòng xử lý / thời gian mỗi lần chạy job nền, đọc lại qua /metrics.
+
+    lags: độ trễ (giây) từ lúc hết hạn tới lúc được xử lý của từng dòng, cộng dồn vào histogram.
+    """
+    if not r:
+        return
+    lags_ms = [lag * 1000 for lag in lags]
+    key = f"metrics:job:{job}"
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.hincrby(key, "runs", 1)
+        pipe.hincrby(key, "rows_total", rows)
+        pipe.hset(key, mapping={
+            "last_rows": rows,
+            "last_duration_ms": round(seconds * 1000, 2),
+            "last_run_at": int(time.time()),
+        })
+        if lags_ms:
+            pipe.hset(key, "last_max_lag_ms", round(max(lags_ms), 2))
+            pipe.hincrby(key, "lag_count", len(lags_ms))
+            pipe.hincrbyfloat(key, "lag_sum_ms", round(sum(lags_ms), 2))
+            for field, count in Counter(_lag_field(lag) for lag in lags_ms).items():
+                pipe.hincrby(key, field, count)
+        pipe.execute()
+    except ConnectionError:
+        pass
+
+
+def _lag_quantiles(stats: dict) -> dict:
+    """Cận trên (ms) của bucket chứa p50/p95/p99; None nếu rơi vào bucket cuối (không có cận)."""
+    total = int(stats.get("lag_count", 0))
+    if not total:
+        return {}
+    buckets = [(bound, int(stats.get(f"lag_le_{bound}", 0))) for bound in LAG_BUCKETS_MS]
+    quantiles = {}
+    for q in LAG_QUANTILES:
+        target = total * q / 100
+        seen = 0
+        quantiles[f"lag_p{q}_le_ms"] = None
+        for bound, count in buckets:
+            seen += count
+            if seen >= target:
+                quantiles[f"lag_p{q}_le_ms"] = bound
+                break
+    return quantiles
+
+
+def job_stats(job: str) -> dict:
+    if not r:
+        return {}
+    try:
+        stats = r.hgetall(f"metrics:job:{job}")
+    except ConnectionError:
+        return {}
+    return {**stats, **_lag_quantiles(stats)}
@@ -0,0 +1,107 @@
+import time
+import uuid
+from typing import Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from app.core.config import settings
+from app.utils.token_revocation import revocation_key
+
+r = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=3,
+    decode_responses=True
+)
+
+ar = aioredis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=3,
+    decode_responses=True
+)
+
+# Mỗi lần login mở 1 "family" refresh token: auth:family:{family}
+#   current = jti của refresh token hợp lệ duy nhất, user_id/role/pid để phát access token
+#   prev/rotated_at = jti vừa bị xoay và thời điểm xoay
+#   login_at = thời điểm login; family login trước mốc thu hồi của user thì bị hủy (role/pid cũ)
+# Family hết hạn tuyệt đối sau REFRESH_TOKEN_EXPIRE_DAYS kể từ login, refresh không gia hạn.
+# Mỗi lần refresh xoay jti. Token cũ bị dùng lại => có thể đã bị lộ, hủy cả family; riêng
+# token vừa bị xoay trong vòng grace thì trả lại jti hiện tại (2 tab refresh cùng lúc).
+
+# KEYS[1] = family, KEYS[2] = mốc thu hồi của user
+# ARGV[1] = jti đang dùng, ARGV[2] = jti mới, ARGV[3] = grace (giây)
+# Trả về {jti, user_id, role, pid} nếu hợp lệ; 0 nếu family không còn; -1 nếu token bị dùng lại;
+# -2 nếu user bị thu hồi token sau khi login.
+_ROTATE_SCRIPT = """
+local f = redis.call('HMGET', KEYS[1], 'current', 'prev', 'rotated_at', 'user_id', 'role', 'pid', 'login_at')
+local current = f[1]
+if not current then
+    return 0
+end
+local revoked = redis.call('GET', KEYS[2])
+if revoked and tonumber(revoked) >= tonumber(f[7] or 0) then
+    redis.call('DEL', KEYS[1])
+    return -2
+end
+local now = tonumber(redis.call('TIME')[1])
+if current == ARGV[1] then
+    redis.call('HSET', KEYS[1], 'current', ARGV[2], 'prev', current, 'rotated_at', now)
+    return {ARGV[2], f[4], f[5], f[6]}
+end
+if f[2] == ARGV[1] and now - tonumber(f[3]) <= tonumber(ARGV[3]) then
+    return {current, f[4], f[5], f[6]}
+end
+redis.call('DEL', KEYS[1])
+return -1
+"""
+
+_rotate = r.register_script(_ROTATE_SCRIPT)
+
+FAMILY_MISSING = 0
+TOKEN_REUSED = -1
+FAMILY_REVOKED = -2
+
+
+def _key(family: str) -> str:
+    return f"auth:family:{family}"
+
+
+def _ttl_seconds() -> int:
+    return settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
+
+
+def new_jti() -> str:
+    return uuid.uuid4().hex
+
+
+async def start_family_async(user_id: int, role: str, property_id: Optional[int]) -> Tuple[str, str]:
+    """Tạo family mới khi login, trả về (family, jti)."""
+    family, jti = uuid.uuid4().hex, new_jti()
+    pipe = ar.pipeline()
+    pipe.hset(_key(family), mapping={
+        "current": jti,
+        "user_id": user_id,
+        "role": role,
+        "pid": "" if property_id is None else property_id,
+        "login_at": int(time.time()),
+    })
+    pipe.expire(_key(family), _ttl_seconds())
+    await pipe.execute()
+    return family, jti
+
+
+def rotate(family: str, user_id: int, jti: str, next_jti: str):
+    """Nguyên tử: đổi current sang next_jti.
+
+    Trả về (jti cấp cho client, user_id, role, property_id) hoặc mã lỗi.
+    """
+    result = _rotate(
+        keys=[_key(family), revocation_key(user_id)],
+        args=[jti, next_jti, settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS],
+    )
+    if not isinstance(result, list):
+        return result
+
+    issued_jti, user_id, role, pid = result
+    return issued_jti, int(user_id), role, int(pid) if pid else None
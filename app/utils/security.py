@@ -1,24 +1,105 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 from jose import jwt
 from app.core.config import settings
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# đổi BCRYPT_ROUNDS thì hash cũ bị coi là cần cập nhật và được hash lại khi login
+pwd = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
-def hash_password(password: str):
+# bcrypt (~250ms CPU) chạy trong process pool riêng để không chiếm GIL/threadpool của API.
+# Login/register là async: chờ hash bằng await, không giữ thread nào của threadpool.
+# Số job chờ bị chặn trên; quá giới hạn thì trả 503 thay vì xếp hàng vô hạn.
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_async_pending = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+# đường sync (startup, create-staff) giữ thread khi chờ nên chỉ cho số nhỏ và không đợi
+_sync_pending = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: không fork process đang chạy nhiều thread
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown_password_pool() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry"
+    )
+
+
+def _run_in_pool(fn, *args):
+    if not _sync_pending.acquire(blocking=False):
+        raise _busy()
+    try:
+        return _get_executor().submit(fn, *args).result()
+    finally:
+        _sync_pending.release()
+
+
+async def _run_in_pool_async(fn, *args):
+    try:
+        await asyncio.wait_for(
+            _async_pending.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        raise _busy()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _async_pending.release()
+
+
+def _hash(password: str) -> str:
     return pwd.hash(password)
 
 
-def verify_password(password: str, hashed: str):
-    return pwd.verify(password, hashed)
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd.verify_and_update(password, hashed)
+
+
+def hash_password(password: str):
+    return _run_in_pool(_hash, password)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_in_pool_async(_hash, password)
+
+
+async def verify_and_update_password_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(đúng mật khẩu?, hash mới nếu tham số cost đã đổi)"""
+    return await _run_in_pool_async(_verify_and_update, password, hashed)
 
 
-def create_access_token(sub: str, role: str):
+def create_access_token(sub: str, role: str, property_id: Optional[int] = None):
     now = datetime.utcnow()
     payload = {
         "sub": sub,
         "role": role,
+        "pid": property_id,
         "scope": "access",
         "iat": now,
         "exp": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
@@ -26,10 +107,12 @@ def create_access_token(sub: str, role: str):
     return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def create_refresh_token(sub: str):
+def create_refresh_token(sub: str, family: str, jti: str):
     now = datetime.utcnow()
     payload = {
         "sub": sub,
+        "fam": family,
+        "jti": jti,
         "scope": "refresh",
         "iat": now,
         "exp": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
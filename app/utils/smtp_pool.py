@@ -0,0 +1,139 @@
+import os
+import queue
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.config import settings
+from app.core.logger import logger
+
+# Pool kết nối SMTP đã login, dùng lại giữa các email trong cùng process (worker Celery).
+# Chạy thử local không cần server thật (không TLS, không login; aiosmtpd trong requirements-dev.txt):
+#   python -m aiosmtpd -n -l localhost:8025
+#   MAIL_SERVER=localhost MAIL_PORT=8025 MAIL_STARTTLS=false MAIL_SSL_TLS=false MAIL_USERNAME=
+
+
+class SMTPPool:
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = False,
+        use_ssl: bool = False,
+        max_size: int = 4,
+        idle_seconds: int = 60,
+        timeout: int = 30,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+
+        # LIFO: lấy kết nối vừa dùng xong, ít khả năng bị server đóng vì idle
+        self._idle = queue.LifoQueue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _reset_after_fork(self) -> None:
+        # worker prefork: kết nối của process cha không dùng chung được
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._idle = queue.LifoQueue(maxsize=self._idle.maxsize)
+
+    def _checkout(self) -> smtplib.SMTP:
+        self._reset_after_fork()
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            if time.monotonic() - last_used < self.idle_seconds:
+                return server
+
+            # idle lâu: kiểm tra còn sống bằng NOOP trước khi dùng lại
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._close(server)
+
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._close(server)
+
+    @contextmanager
+    def connection(self):
+        server = self._checkout()
+        try:
+            yield server
+        except (smtplib.SMTPServerDisconnected, OSError):
+            # kết nối hỏng thì bỏ, không trả lại pool
+            server.close()
+            raise
+        except Exception:
+            self._checkin(server)
+            raise
+        else:
+            self._checkin(server)
+
+    def send(self, sender: str, to: str, message: str) -> None:
+        try:
+            with self.connection() as server:
+                server.sendmail(sender, to, message)
+        except smtplib.SMTPServerDisconnected:
+            # kết nối trong pool bị server đóng ngầm, thử lại 1 lần bằng kết nối mới
+            logger.info("[SMTPPool] stale connection, reconnecting")
+            with self.connection() as server:
+                server.sendmail(sender, to, message)
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+
+smtp_pool = SMTPPool(
+    host=settings.MAIL_SERVER,
+    port=settings.MAIL_PORT,
+    username=settings.MAIL_USERNAME,
+    password=settings.MAIL_PASSWORD,
+    use_tls=settings.MAIL_STARTTLS,
+    use_ssl=settings.MAIL_SSL_TLS,
+    max_size=settings.MAIL_POOL_SIZE,
+    idle_seconds=settings.MAIL_POOL_IDLE_SECONDS,
+)
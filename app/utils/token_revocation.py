@@ -0,0 +1,104 @@
+import time
+from typing import Optional
+
+import redis
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.user import User
+from app.utils.redis_cache import LocalCache
+
+# Eviction áp dụng cho cả instance Redis, không theo db (db 3 dùng chung với rate_limit,
+# refresh_tokens): muốn mốc thu hồi không bị mất thì instance phải chạy maxmemory-policy noeviction.
+r = redis.Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=3,
+    decode_responses=True
+)
+
+# user_id -> b"" (không bị thu hồi) hoặc b"<epoch>" (token phát hành trước mốc này bị từ chối)
+_local = LocalCache(max_items=10000, ttl_seconds=settings.AUTH_REVOCATION_CACHE_SECONDS)
+
+_NOT_REVOKED = b""
+
+
+def revocation_key(user_id: int) -> str:
+    return f"auth:revoked:user:{user_id}"
+
+
+def revoke_user_tokens(user_id: int) -> None:
+    """Thu hồi mọi token đã phát cho user (khóa tài khoản, đổi quyền...)."""
+    now = int(time.time())
+    # giữ bằng đời refresh token: sau đó mọi token cũ đều đã hết hạn
+    r.set(revocation_key(user_id), now, ex=settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+    _local.pop(revocation_key(user_id))
+
+
+def is_token_revoked(user_id: int, issued_at: int) -> Optional[bool]:
+    """True/False theo mốc thu hồi; None nếu Redis không trả lời (caller tự kiểm tra DB)."""
+    key = revocation_key(user_id)
+    raw = _local.get(key)
+    if raw is None:
+        try:
+            value = r.get(key)
+        except redis.RedisError:
+            return None
+        raw = value.encode() if value else _NOT_REVOKED
+        _local.set(key, raw)
+
+    if raw == _NOT_REVOKED:
+        return False
+    return issued_at <= int(raw)
+
+
+def revocation_stats() -> dict:
+    return _local.stats()
+
+
+# Claim trong token (role, pid) và quyền đăng nhập (is_active) đổi thì token cũ phải bị thu hồi,
+# bất kể thay đổi đến từ đâu -> bắt ở session event, thu hồi sau khi commit.
+_PENDING_KEY = "revoke_user_ids"
+_WATCHED_FIELDS = ("is_active", "role", "property_id")
+
+
+def _collect_user_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, set())
+
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            pending.add(obj.id)
+
+    for obj in session.dirty:
+        if not isinstance(obj, User):
+            continue
+        attrs = inspect(obj).attrs
+        if any(attrs[name].history.has_changes() for name in _WATCHED_FIELDS):
+            pending.add(obj.id)
+
+
+def _revoke_pending(session: Session) -> None:
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    if not user_ids:
+        return
+
+    for user_id in user_ids:
+        try:
+            revoke_user_tokens(user_id)
+        except redis.RedisError as e:
+            logger.error(f"[Auth] revoke tokens failed for user {user_id}: {e}")
+
+
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def register_token_revocation() -> None:
+    if event.contains(Session, "after_flush", _collect_user_changes):
+        return
+
+    event.listen(Session, "after_flush", _collect_user_changes)
+    event.listen(Session, "after_commit", _revoke_pending)
+    event.listen(Session, "after_rollback", _discard_pending)
@@ -1,5 +1,7 @@
 from celery import Celery
 from app.core.config import settings
+from app.utils.cache_invalidation import register_cache_invalidation
+from app.utils.token_revocation import register_token_revocation
 
 celery_app = Celery(
     "booking_system",
@@ -16,8 +18,15 @@ celery_app.conf.beat_schedule = {
         "task": "cleanup_expired_bookings",
         "schedule": 30,
     },
+    "reconcile-room-inventory-hourly": {
+        "task": "reconcile_room_inventory",
+        "schedule": 3600,
+    },
 }
 
+register_cache_invalidation()
+register_token_revocation()
+
 celery_app.conf.timezone = "Asia/Ho_Chi_Minh"
 
 celery_app.conf.update(
@@ -1,34 +1,161 @@
+import smtplib
+import time
+import redis
+from sqlalchemy import text
 from sqlmodel import Session, select
-from datetime import datetime
+from datetime import date, datetime
+from typing import List
 
+from app.core.config import settings
 from app.core.database import engine
-from app.models.booking import Booking
-from app.utils.lock import release_room_lock
+from app.core.logger import logger
+from app.models.property import Property
+from app.repositories.booking_repo import BookingRepository
+from app.repositories.inventory_repo import InventoryRepository
+from app.repositories.rating_stats_repo import RatingStatsRepository
+from app.services.mail_service import MailService
+from app.utils.lock import release_many_room_holds
+from app.utils.redis_cache import record_job_run, invalidate_tags, property_tag, SEARCH_PROPERTY_TAG
 from app.worker.celery_app import celery_app
 
 
+def _finish_expired(session: Session, expired) -> List[float]:
+    """Trừ held trong inventory (1 upsert cho cả lô), commit rồi nhả hold; trả về độ trễ (giây) từng booking."""
+    InventoryRepository.adjust_many(
+        session,
+        ((selected_rooms or [], checkin, checkout) for _, selected_rooms, checkin, checkout, _ in expired),
+        held=-1,
+    )
+
+    session.commit()
+
+    # hold đã quá hạn tự hết TTL, nhả ở đây chỉ để dọn sớm nên Redis lỗi thì bỏ qua
+    try:
+        release_many_room_holds(
+            (b_id, selected_rooms or [], checkin, checkout)
+            for b_id, selected_rooms, checkin, checkout, _ in expired
+        )
+    except redis.RedisError as e:
+        logger.warning(f"[Cleanup] release holds failed: {e}")
+
+    now = datetime.utcnow()
+    return [(now - expires_at).total_seconds() for *_, expires_at in expired]
+
+
+@celery_app.task(name="expire_booking")
+def expire_booking(booking_id: int):
+    """Hủy đúng lúc 1 booking hết hạn (đặt lịch bằng countdown khi tạo booking)."""
+    started = time.perf_counter()
+
+    with Session(engine) as session:
+        expired = BookingRepository.expire_pending(
+            session, datetime.utcnow(), 1, booking_id=booking_id
+        )
+        if not expired:
+            # đã thanh toán / đã hủy, hoặc đang bị confirm_payment khóa
+            return f"Booking #{booking_id} not expired"
+
+        lags = _finish_expired(session, expired)
+
+    record_job_run("expire_booking", 1, time.perf_counter() - started, lags=lags)
+    return f"Cancelled expired booking #{booking_id}"
+
+
 @celery_app.task(name="cleanup_expired_bookings")
 def cleanup_expired_bookings():
+    """Lưới an toàn cho expire_booking (task bị mất, worker chết...)."""
+    started = time.perf_counter()
+    total = 0
+    lags = []
+
     with Session(engine) as session:
-        now = datetime.utcnow()
+        while True:
+            # mỗi lô 1 transaction ngắn; lô chưa đầy nghĩa là đã hết booking hết hạn
+            expired = BookingRepository.expire_pending(
+                session, datetime.utcnow(), settings.BOOKING_CLEANUP_BATCH_SIZE
+            )
+            if not expired:
+                break
 
-        stmt = select(Booking).where(
-            Booking.status == "pending",
-            Booking.expires_at < now
-        )
+            lags.extend(_finish_expired(session, expired))
+
+            total += len(expired)
+            if len(expired) < settings.BOOKING_CLEANUP_BATCH_SIZE:
+                break
 
-        expired_list = session.exec(stmt).all()
+    record_job_run("cleanup_expired_bookings", total, time.perf_counter() - started, lags=lags)
+    return f"Cancelled {total} expired bookings"
 
-        for b in expired_list:
 
-            rooms = b.selected_rooms or []
+@celery_app.task(name="reconcile_room_inventory")
+def reconcile_room_inventory():
+    """Đối soát room_type_inventory với booked_room + booking pending, sửa và báo các đêm lệch.
 
-            for rid in rooms:
-                release_room_lock(rid, b.checkin, b.checkout)
+    Mỗi loại phòng 1 transaction ngắn, chỉ khóa dòng của loại đó: booking/thanh toán/hủy
+    của loại phòng khác không phải chờ.
+    """
+    since = date.today()
+    started = time.perf_counter()
+    drifted = 0
 
-            b.status = "cancelled"
-            session.add(b)
+    with Session(engine) as session:
+        room_type_ids = InventoryRepository.room_type_ids(session)
+        session.commit()
+
+        for rt_id in room_type_ids:
+            drift = InventoryRepository.reconcile_room_type(session, rt_id, since)
+            session.commit()
+
+            drifted += len(drift)
+            for night, got, want in drift[:20]:
+                logger.warning(
+                    f"[Inventory] drift room_type={rt_id} night={night} "
+                    f"(total, booked, held) current={got} expected={want}"
+                )
 
+    record_job_run("reconcile_room_inventory", drifted, time.perf_counter() - started)
+    return f"Reconciled {len(room_type_ids)} room types, {drifted} nights drifted"
+
+
+@celery_app.task(name="rebuild_property_rating_stats")
+def rebuild_property_rating_stats():
+    """Tính lại property_rating_stats từ bảng review.
+
+    Chạy tay: celery -A app.worker.celery_app call rebuild_property_rating_stats
+    """
+    with Session(engine) as session:
+        # khóa để add/delete review đồng thời không cộng dồn lên dữ liệu đang bị ghi đè
+        session.exec(text("LOCK TABLE property_rating_stats IN SHARE ROW EXCLUSIVE MODE"))
+        count = RatingStatsRepository.rebuild(session)
         session.commit()
+        property_ids = session.exec(select(Property.id)).all()
+
+    # rating nằm trong cả detail lẫn các kết quả search
+    invalidate_tags(*[property_tag(pid) for pid in property_ids], SEARCH_PROPERTY_TAG)
+    return f"Rebuilt rating stats for {count} properties"
+
+
+# Lỗi SMTP/mạng thì retry với backoff lũy thừa (có jitter), tối đa MAIL_MAX_RETRIES lần
+_MAIL_RETRY = dict(
+    autoretry_for=(smtplib.SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=settings.MAIL_MAX_RETRIES,
+)
+
+
+@celery_app.task(name="send_booking_confirmation_email", **_MAIL_RETRY)
+def send_booking_confirmation_email(booking_id: int):
+    return MailService().send_booking_confirmation(booking_id)
+
+
+@celery_app.task(name="send_payment_success_email", **_MAIL_RETRY)
+def send_payment_success_email(booking_id: int):
+    return MailService().send_payment_success(booking_id)
+
 
-    return f"Cancelled {len(expired_list)} expired bookings"
+@celery_app.task(name="send_booking_confirmation_emails")
+def send_booking_confirmation_emails(booking_ids: list):
+    """Gửi lô (digest/bulk): render cả lô 1 lượt, lỗi từng mail chỉ được log."""
+    return MailService().send_booking_confirmations(booking_ids)
@@ -0,0 +1,189 @@
+"""Hàm dùng chung cho các script bench (đo thời gian, đếm query, tải HTTP)."""
+import asyncio
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Awaitable, Callable, List, Tuple
+
+from sqlalchemy import event
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    index = round(p / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def report(label: str, timings_ms: List[float], extra: str = "") -> None:
+    if not timings_ms:
+        print(f"{label:<28} n=0 {extra}")
+        return
+    values = sorted(timings_ms)
+    print(
+        f"{label:<28} n={len(values):<6} "
+        f"p50={percentile(values, 50):8.2f}ms "
+        f"p95={percentile(values, 95):8.2f}ms "
+        f"p99={percentile(values, 99):8.2f}ms "
+        f"max={values[-1]:8.2f}ms {extra}"
+    )
+
+
+class QueryCounter:
+    """Đếm số statement gửi xuống DB qua before_cursor_execute của engine (sync)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    @contextmanager
+    def listening(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def timed(fn: Callable, *args, **kwargs) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000, result
+
+
+async def http_load(
+    client,
+    send: Callable[[object, int], Awaitable[object]],
+    concurrency: int,
+    seconds: float,
+) -> Tuple[List[float], Counter]:
+    """Chạy `concurrency` worker gọi send(client, i) liên tục trong `seconds` giây.
+
+    Trả về (thời gian từng request ms, số lần theo status code / tên exception).
+    """
+    timings: List[float] = []
+    statuses: Counter = Counter()
+    deadline = time.perf_counter() + seconds
+
+    async def worker(worker_id: int):
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await send(client, worker_id * 1_000_000 + i)
+                statuses[response.status_code] += 1
+            except Exception as e:
+                statuses[type(e).__name__] += 1
+            timings.append((time.perf_counter() - started) * 1000)
+            i += 1
+
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return timings, statuses
+
+
+# ---- seed / dọn dữ liệu bench (Postgres thật, dùng engine trong .env) ----
+# Chỉ chạy trên DB dev/bench. Mọi dòng seed gắn với property/user được trả về để cleanup() xóa.
+
+SEED_CHUNK_SIZE = 5000
+
+
+def insert_ids(session, model, rows: List[dict]) -> List[int]:
+    """INSERT nhiều dòng theo lô ... RETURNING id, không commit."""
+    from sqlalchemy import insert
+
+    ids: List[int] = []
+    for i in range(0, len(rows), SEED_CHUNK_SIZE):
+        stmt = insert(model).values(rows[i:i + SEED_CHUNK_SIZE]).returning(model.id)
+        ids.extend(session.execute(stmt).scalars().all())
+    return ids
+
+
+def seed_user(session, email: str, password_hash: str = "x", role=None) -> int:
+    from app.models.user import User
+    from app.utils.enums import UserRole
+
+    return insert_ids(session, User, [{
+        "email": email,
+        "password_hash": password_hash,
+        "full_name": "Bench",
+        "role": role or UserRole.CUSTOMER,
+        "is_active": True,
+    }])[0]
+
+
+def seed_property(session, name: str, room_types: int, rooms_per_type: int) -> Tuple[int, dict]:
+    """Tạo 1 property; trả về (property_id, {room_type_id: [room_id, ...]})."""
+    from app.models.property import Property
+    from app.models.room import Room
+    from app.models.room_type import RoomType
+
+    property_id = insert_ids(session, Property, [{"name": name, "is_active": True}])[0]
+    rt_ids = insert_ids(session, RoomType, [
+        {"property_id": property_id, "name": f"Type {i}", "price": 100 + i, "max_occupancy": 2, "is_active": True}
+        for i in range(room_types)
+    ])
+    rooms = {}
+    for rt_id in rt_ids:
+        rooms[rt_id] = insert_ids(session, Room, [
+            {"room_type_id": rt_id, "name": f"{rt_id}-{j}", "is_active": True}
+            for j in range(rooms_per_type)
+        ])
+    return property_id, rooms
+
+
+def seed_booked_stays(session, user_id: int, room_ids: List[int], start, waves: int, nights: int = 2) -> int:
+    """Mỗi phòng `waves` lần ở đã thanh toán, không giao nhau: [start + w*(nights+1), +nights)."""
+    from datetime import timedelta
+
+    from app.models.booked_room import BookedRoom
+    from app.models.booking import Booking
+    from app.utils.enums import BookingStatus
+
+    rows = []
+    for w in range(waves):
+        checkin = start + timedelta(days=w * (nights + 1))
+        checkout = checkin + timedelta(days=nights)
+        booking_id = insert_ids(session, Booking, [{
+            "user_id": user_id,
+            "checkin": checkin,
+            "checkout": checkout,
+            "status": BookingStatus.PAID,
+            "selected_rooms": room_ids,
+        }])[0]
+        rows.extend(
+            {"booking_id": booking_id, "room_id": rid, "checkin": checkin, "checkout": checkout}
+            for rid in room_ids
+        )
+    insert_ids(session, BookedRoom, rows)
+    return len(rows)
+
+
+def cleanup(session, property_ids: List[int], user_ids: List[int]) -> None:
+    """Xóa mọi thứ đã seed (và booking/payment bench tạo qua API cho các user này), rồi commit."""
+    from sqlalchemy import delete, select
+
+    from app.models import (
+        BookedRoom, Booking, Payment, Property, PropertyAmenity, PropertyRatingStats,
+        Review, Room, RoomType, RoomTypeInventory, User,
+    )
+
+    booking_ids = select(Booking.id).where(Booking.user_id.in_(user_ids))
+    session.execute(delete(Payment).where(Payment.booking_id.in_(booking_ids)))
+    session.execute(delete(BookedRoom).where(BookedRoom.booking_id.in_(booking_ids)))
+    session.execute(delete(Review).where(Review.user_id.in_(user_ids)))
+    session.execute(delete(Booking).where(Booking.user_id.in_(user_ids)))
+
+    for i in range(0, len(property_ids), SEED_CHUNK_SIZE):
+        chunk = property_ids[i:i + SEED_CHUNK_SIZE]
+        rt_ids = select(RoomType.id).where(RoomType.property_id.in_(chunk))
+        session.execute(delete(RoomTypeInventory).where(RoomTypeInventory.room_type_id.in_(rt_ids)))
+        session.execute(delete(Room).where(Room.room_type_id.in_(rt_ids)))
+        session.execute(delete(RoomType).where(RoomType.property_id.in_(chunk)))
+        session.execute(delete(Review).where(Review.property_id.in_(chunk)))
+        session.execute(delete(PropertyRatingStats).where(PropertyRatingStats.property_id.in_(chunk)))
+        session.execute(delete(PropertyAmenity).where(PropertyAmenity.property_id.in_(chunk)))
+        session.execute(delete(Property).where(Property.id.in_(chunk)))
+
+    session.execute(delete(User).where(User.id.in_(user_ids)))
+    session.commit()
@@ -0,0 +1,84 @@
+"""Thông lượng endpoint cần đăng nhập: load User từ DB mỗi request (cũ) vs claim trong JWT.
+
+    python -m bench.auth_throughput --concurrency 16 64 --seconds 10
+
+Dựng 1 app FastAPI nhỏ trong process (httpx.ASGITransport, không qua mạng) với 2 route giống
+nhau, chỉ khác dependency xác thực:
+  - /db     : get_current_user — session.get(User) mỗi request (như trước user-021)
+  - /claims : get_current_principal — id/role từ token, kiểm tra thu hồi qua cache + Redis
+Seed 1 user vào DB cấu hình trong .env, phát access token rồi với mỗi mức concurrency in
+requests/sec, số query DB mỗi request và p50/p95/p99 (ms). User seed bị xóa khi xong.
+"""
+import argparse
+import asyncio
+import uuid
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.schemas.auth import AuthUser
+from app.utils.dependencies import get_current_principal, get_current_user
+from app.utils.enums import UserRole
+from app.utils.security import create_access_token
+from bench._common import QueryCounter, cleanup, http_load, report, seed_user
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/db")
+    def by_db(user=Depends(get_current_user)):
+        return {"id": user.id, "role": user.role}
+
+    @app.get("/claims")
+    def by_claims(user: AuthUser = Depends(get_current_principal)):
+        return {"id": user.id, "role": user.role}
+
+    return app
+
+
+async def run(app: FastAPI, token: str, args) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    counter = QueryCounter(engine)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for concurrency in args.concurrency:
+            for label, path in (("get_current_user (DB)", "/db"), ("get_current_principal", "/claims")):
+                async def send(client, i):
+                    return await client.get(path, headers=headers)
+
+                await http_load(client, send, concurrency, 1)  # warmup
+                counter.count = 0
+                with counter.listening():
+                    timings, statuses = await http_load(client, send, concurrency, args.seconds)
+                rps = len(timings) / args.seconds
+                report(
+                    f"{label} c={concurrency}",
+                    timings,
+                    f"rps={rps:.0f} queries/req={counter.count / max(len(timings), 1):.2f} {dict(statuses)}",
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 64])
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user_id = seed_user(session, f"bench-auth-{uuid.uuid4().hex[:8]}@example.com")
+        session.commit()
+
+    try:
+        token = create_access_token(str(user_id), UserRole.CUSTOMER.value)
+        asyncio.run(run(build_app(), token, args))
+    finally:
+        with Session(engine) as session:
+            cleanup(session, [], [user_id])
+
+
+if __name__ == "__main__":
+    main()
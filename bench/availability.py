@@ -0,0 +1,129 @@
+"""So sánh tìm phòng trống: AvailabilityRepository (1 query) vs đường cũ mỗi phòng 1 query.
+
+    python -m bench.availability --room-types 10 --rooms-per-type 300 --waves 20 -n 50
+
+Seed vào DB cấu hình trong .env (nên là DB dev/bench) 1 property với room_types * rooms_per_type
+phòng; mỗi phòng `waves` lần ở đã thanh toán không giao nhau, cộng thêm vài booking pending còn hạn.
+Mỗi lượt tra trên khoảng ngày ngẫu nhiên trong vùng đã seed và in số query + p50/p95/p99 (ms)
+của từng cách. Dữ liệu seed bị xóa khi xong (trừ khi --keep). Engine mới đọc thêm hold trong
+Redis (1 round trip, bỏ qua nếu Redis không chạy); đường cũ không lọc hold.
+"""
+import argparse
+import random
+import uuid
+from datetime import date, datetime, timedelta
+
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.booked_room import BookedRoom
+from app.models.booking import Booking
+from app.models.room import Room
+from app.repositories.availability_repo import AvailabilityRepository
+from app.utils.enums import BookingStatus
+from bench._common import (
+    QueryCounter, cleanup, insert_ids, report, seed_booked_stays, seed_property, seed_user, timed,
+)
+
+NIGHTS_PER_STAY = 2
+
+
+def legacy_available_rooms(session: Session, room_type_ids, checkin: date, checkout: date):
+    """Đường cũ (RoomService.get_available_rooms + RoomRepository.is_available): 1 + N query."""
+    available = []
+    for room_type_id in room_type_ids:
+        rooms = session.exec(select(Room).where(Room.room_type_id == room_type_id)).all()
+        for room in rooms:
+            conflict = session.exec(
+                select(BookedRoom)
+                .where(BookedRoom.room_id == room.id)
+                .where(BookedRoom.checkin < checkout)
+                .where(BookedRoom.checkout > checkin)
+            ).first()
+            if not conflict:
+                available.append(room)
+    return available
+
+
+def _seed(session: Session, args):
+    start = date.today() + timedelta(days=1)
+    user_id = seed_user(session, f"bench-availability-{uuid.uuid4().hex[:8]}@example.com")
+    property_id, rooms = seed_property(session, "bench-availability", args.room_types, args.rooms_per_type)
+
+    booked = 0
+    for room_ids in rooms.values():
+        # nửa số phòng kín lịch, nửa còn lại trống để kết quả không rỗng
+        booked += seed_booked_stays(session, user_id, room_ids[: len(room_ids) // 2], start, args.waves, NIGHTS_PER_STAY)
+
+    span = args.waves * (NIGHTS_PER_STAY + 1)
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    pending = []
+    for room_ids in rooms.values():
+        free = room_ids[len(room_ids) // 2:]
+        for _ in range(args.pending):
+            checkin = start + timedelta(days=random.randrange(span))
+            pending.append({
+                "user_id": user_id,
+                "checkin": checkin,
+                "checkout": checkin + timedelta(days=NIGHTS_PER_STAY),
+                "status": BookingStatus.PENDING,
+                "expires_at": expires_at,
+                "selected_rooms": random.sample(free, min(3, len(free))),
+            })
+    insert_ids(session, Booking, pending)
+    session.commit()
+    print(f"seeded: {sum(len(v) for v in rooms.values())} rooms, {booked} booked_room, {len(pending)} pending bookings")
+    return property_id, user_id, list(rooms), start, span
+
+
+def _measure(label: str, fn, room_type_ids, ranges) -> None:
+    counter = QueryCounter(engine)
+    timings, query_counts, found = [], set(), set()
+    with counter.listening():
+        for checkin, checkout in ranges:
+            with Session(engine) as session:
+                counter.count = 0
+                elapsed_ms, rooms = timed(fn, session, room_type_ids, checkin, checkout)
+            timings.append(elapsed_ms)
+            query_counts.add(counter.count)
+            found.add(len(rooms))
+    report(label, timings, f"queries={sorted(query_counts)} rooms_found={min(found)}..{max(found)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--room-types", type=int, default=10)
+    parser.add_argument("--rooms-per-type", type=int, default=300)
+    parser.add_argument("--waves", type=int, default=20)
+    parser.add_argument("--pending", type=int, default=50, help="booking pending mỗi room type")
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="không xóa dữ liệu seed")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        property_id, user_id, room_type_ids, start, span = _seed(session, args)
+
+    try:
+        rng = random.Random(42)
+        ranges = []
+        for _ in range(args.warmup + args.iterations):
+            checkin = start + timedelta(days=rng.randrange(span))
+            ranges.append((checkin, checkin + timedelta(days=rng.randint(1, 5))))
+
+        for label, fn in (
+            ("per-room (cũ)", legacy_available_rooms),
+            ("availability engine", AvailabilityRepository.get_available_rooms),
+        ):
+            for checkin, checkout in ranges[: args.warmup]:
+                with Session(engine) as session:
+                    fn(session, room_type_ids, checkin, checkout)
+            _measure(label, fn, room_type_ids, ranges[args.warmup:])
+    finally:
+        if not args.keep:
+            with Session(engine) as session:
+                cleanup(session, [property_id], [user_id])
+
+
+if __name__ == "__main__":
+    main()
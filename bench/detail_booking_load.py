@@ -0,0 +1,89 @@
+"""Tải đồng thời GET /properties/{id} và POST /booking trên API đang chạy: requests/sec và p95.
+
+    uvicorn app.main:app --workers 1 &
+    python -m bench.detail_booking_load --base-url http://localhost:8000 --concurrency 16 32 64
+
+Seed 1 property (--room-types x --rooms-per-type phòng) vào DB cấu hình trong .env, đăng ký +
+login 1 khách qua API, rồi với mỗi mức concurrency chạy riêng từng endpoint trong --seconds giây.
+Mỗi POST /booking đặt 1 phòng ở 1 khoảng ngày chưa ai đặt (phòng n % N, tuần thứ n // N, n tăng dần) nên đo
+đường tạo booking chứ không phải đường 409. Dữ liệu seed và booking tạo ra bị xóa khi xong.
+Chạy lại trên commit trước khi chuyển 2 route này sang async để có số "before".
+"""
+import argparse
+import asyncio
+import itertools
+import uuid
+from datetime import date, timedelta
+
+import httpx
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.user import User
+from bench._common import cleanup, http_load, report, seed_property
+
+PASSWORD = "bench-password-123"
+
+
+async def _login(client: httpx.AsyncClient, email: str) -> str:
+    response = await client.post("/auth/register", json={"email": email, "password": PASSWORD, "full_name": "Bench"})
+    response.raise_for_status()
+    response = await client.post("/auth/login", data={"username": email, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run(args, property_id: int, room_ids: list, email: str) -> None:
+    start = date.today() + timedelta(days=30)
+    stays = itertools.count()
+
+    limits = httpx.Limits(max_connections=max(args.concurrency))
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        token = await _login(client, email)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        async def detail(client, i):
+            return await client.get(f"/properties/{property_id}")
+
+        async def book(client, i):
+            n = next(stays)
+            checkin = start + timedelta(days=7 * (n // len(room_ids)))
+            return await client.post("/booking", headers=headers, json={
+                "room_ids": [room_ids[n % len(room_ids)]],
+                "checkin": checkin.isoformat(),
+                "checkout": (checkin + timedelta(days=2)).isoformat(),
+            })
+
+        for concurrency in args.concurrency:
+            for label, send in (("GET /properties/{id}", detail), ("POST /booking", book)):
+                timings, statuses = await http_load(client, send, concurrency, args.seconds)
+                rps = len(timings) / args.seconds
+                report(f"{label} c={concurrency}", timings, f"rps={rps:.0f} {dict(statuses)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--room-types", type=int, default=5)
+    parser.add_argument("--rooms-per-type", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--keep", action="store_true", help="không xóa dữ liệu seed")
+    args = parser.parse_args()
+
+    email = f"bench-load-{uuid.uuid4().hex[:8]}@example.com"
+    with Session(engine) as session:
+        property_id, rooms = seed_property(session, "bench-load", args.room_types, args.rooms_per_type)
+        session.commit()
+
+    try:
+        asyncio.run(run(args, property_id, [rid for ids in rooms.values() for rid in ids], email))
+    finally:
+        if not args.keep:
+            with Session(engine) as session:
+                user_ids = session.exec(select(User.id).where(User.email == email)).all()
+                cleanup(session, [property_id], list(user_ids))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Thông lượng render email xác nhận booking: f-string + query từng phòng (cũ) vs Jinja2, lẻ và theo lô.
+
+    python -m bench.email_render --bookings 2000 --rooms-per-booking 3 --batch-size 200
+
+Seed --bookings booking đã thanh toán (mỗi booking --rooms-per-booking phòng) vào DB cấu hình
+trong .env, rồi render email cho toàn bộ theo 3 cách, không gửi SMTP:
+  - cũ: mỗi booking 1 session, get Booking/User, rồi mỗi phòng select Room + get RoomType
+  - Jinja2 lẻ: render_booking_emails cho từng booking (như send_booking_confirmation)
+  - Jinja2 lô: render_booking_emails cho --batch-size booking một lần (send_booking_confirmations)
+In emails/s, số query mỗi email và p50/p95/p99 (ms) của mỗi lần gọi. Dữ liệu seed bị xóa khi xong.
+"""
+import argparse
+import time
+import uuid
+from datetime import date, timedelta
+
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.booked_room import BookedRoom
+from app.models.booking import Booking
+from app.models.room import Room
+from app.models.room_type import RoomType
+from app.models.user import User
+from app.services.mail_service import MailService
+from bench._common import QueryCounter, cleanup, report, seed_booked_stays, seed_property, seed_user, timed
+
+
+def legacy_render(sender_name: str, booking_id: int) -> str:
+    """MailService.send_booking_confirmation + _build_booking_email_template trước user-018."""
+    with Session(engine) as session:
+        booking = session.get(Booking, booking_id)
+        user = session.get(User, booking.user_id)
+        rooms = session.exec(select(BookedRoom).where(BookedRoom.booking_id == booking_id)).all()
+
+        room_items = ""
+        for r in rooms:
+            room_obj = session.exec(select(Room).where(Room.id == r.room_id)).first()
+            room_type = session.get(RoomType, room_obj.room_type_id)
+            room_items += f"""
+                <tr>
+                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{r.room_id}</td>
+                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{room_type.name}</td>
+                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{r.checkin} → {r.checkout}</td>
+                    <td style="padding: 8px; border-bottom: 1px solid #eee;">{room_type.price:,} đ/đêm</td>
+                </tr>
+            """
+
+        return f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto;">
+                <h2 style="color: #2b7cff;">Xin chào {user.full_name},</h2>
+                <p>Cảm ơn bạn đã sử dụng hệ thống <strong>Hotel Booking</strong>.</p>
+                <p>#{booking.id} — {booking.booking_date}</p>
+                <table style="width: 100%; border-collapse: collapse; margin-top: 10px;">
+                    {room_items}
+                </table>
+                <p>Trân trọng,<br> <strong>{sender_name}</strong></p>
+            </div>
+        </body>
+        </html>
+        """
+
+
+def _seed(session: Session, args):
+    user_id = seed_user(session, f"bench-email-{uuid.uuid4().hex[:8]}@example.com")
+    groups = max(args.bookings // args.waves, 1)
+    property_id, rooms = seed_property(session, "bench-email", 4, groups * args.rooms_per_booking // 4 + 1)
+    room_ids = [rid for ids in rooms.values() for rid in ids]
+
+    start = date.today() + timedelta(days=1)
+    for g in range(groups):
+        group = room_ids[g * args.rooms_per_booking:(g + 1) * args.rooms_per_booking]
+        seed_booked_stays(session, user_id, group, start, args.waves)
+    session.commit()
+
+    booking_ids = list(session.exec(select(Booking.id).where(Booking.user_id == user_id).order_by(Booking.id)).all())
+    print(f"seeded: {len(booking_ids)} bookings x {args.rooms_per_booking} rooms")
+    return property_id, user_id, booking_ids
+
+
+def _measure(label: str, calls, emails: int) -> None:
+    counter = QueryCounter(engine)
+    timings = []
+    with counter.listening():
+        started = time.perf_counter()
+        for fn, *fn_args in calls:
+            elapsed_ms, _ = timed(fn, *fn_args)
+            timings.append(elapsed_ms)
+        total = time.perf_counter() - started
+    report(label, timings, f"emails/s={emails / total:.0f} queries/email={counter.count / emails:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--rooms-per-booking", type=int, default=3)
+    parser.add_argument("--waves", type=int, default=50, help="số booking nối tiếp trên cùng nhóm phòng")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="không xóa dữ liệu seed")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        property_id, user_id, booking_ids = _seed(session, args)
+
+    mail = MailService()
+
+    def render_one(booking_id):
+        with Session(engine) as session:
+            return mail.render_booking_emails(session, [booking_id])
+
+    def render_batch(ids):
+        with Session(engine) as session:
+            return mail.render_booking_emails(session, ids)
+
+    batches = [booking_ids[i:i + args.batch_size] for i in range(0, len(booking_ids), args.batch_size)]
+    try:
+        # nạp template/kết nối pool trước khi đo
+        render_batch(booking_ids[:10])
+        legacy_render(mail.sender_name, booking_ids[0])
+
+        _measure("f-string + query/phòng (cũ)", [(legacy_render, mail.sender_name, b) for b in booking_ids], len(booking_ids))
+        _measure("Jinja2 lẻ", [(render_one, b) for b in booking_ids], len(booking_ids))
+        _measure(f"Jinja2 lô {args.batch_size}", [(render_batch, b) for b in batches], len(booking_ids))
+    finally:
+        if not args.keep:
+            with Session(engine) as session:
+                cleanup(session, [property_id], [user_id])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Tranh chấp giữ phòng trong Redis: script Lua giữ nguyên tử vs SET NX từng phòng (bản cũ).
+
+    python -m bench.hold_contention --workers 64 --rooms 20 --rooms-per-booking 3 --seconds 10
+
+--workers client cùng lúc liên tục giữ --rooms-per-booking phòng ngẫu nhiên trong --rooms phòng,
+giữ --hold-ms (giả lập insert booking) rồi nhả. Mặc định mọi lượt cùng khoảng ngày; --overlap cho
+mỗi lượt 1 khoảng ngày ngẫu nhiên giao nhau. Với mỗi cách in: số lượt thành công/thất bại, số round
+trip Redis, p50/p95/p99 (ms) của bước giữ, và số lần 2 booking cùng giữ 1 đêm của 1 phòng (key cũ
+theo đúng cặp checkin/checkout nên không thấy 2 khoảng giao nhau).
+Dùng Redis trong .env (db 2); room id nằm trên --room-base để không đụng hold thật.
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from app.utils import lock
+from bench._common import report
+
+LEGACY_LOCK_EXPIRE = 60 * 15
+
+
+def _legacy_key(room_id: int, checkin: date, checkout: date) -> str:
+    return f"bench:lock:room:{room_id}:{checkin}:{checkout}"
+
+
+async def legacy_acquire(stats: Counter, booking_id, room_ids, checkin, checkout) -> bool:
+    """acquire_room_lock_async trước user-012: mỗi phòng 1 SET NX, đụng thì DEL các phòng đã giữ."""
+    locked = []
+    for room_id in room_ids:
+        stats["round_trips"] += 1
+        if not await lock.ar.set(_legacy_key(room_id, checkin, checkout), "1", nx=True, ex=LEGACY_LOCK_EXPIRE):
+            for rid in locked:
+                stats["round_trips"] += 1
+                await lock.ar.delete(_legacy_key(rid, checkin, checkout))
+            return False
+        locked.append(room_id)
+    return True
+
+
+async def legacy_release(stats: Counter, booking_id, room_ids, checkin, checkout) -> None:
+    for room_id in room_ids:
+        stats["round_trips"] += 1
+        await lock.ar.delete(_legacy_key(room_id, checkin, checkout))
+
+
+async def script_acquire(stats: Counter, booking_id, room_ids, checkin, checkout) -> bool:
+    stats["round_trips"] += 1
+    conflict = await lock.acquire_room_holds_async(booking_id, room_ids, checkin, checkout, LEGACY_LOCK_EXPIRE)
+    return conflict is None
+
+
+async def script_release(stats: Counter, booking_id, room_ids, checkin, checkout) -> None:
+    stats["round_trips"] += 1
+    await lock.release_room_holds_async(booking_id, room_ids, checkin, checkout)
+
+
+async def run(label: str, acquire, release, args) -> None:
+    rng = random.Random(42)
+    rooms = [args.room_base + i for i in range(args.rooms)]
+    start = date.today() + timedelta(days=30)
+    booking_ids = itertools.count(args.room_base)
+    deadline = time.perf_counter() + args.seconds
+
+    stats: Counter = Counter()
+    timings = []
+    held_nights: Counter = Counter()  # (room, đêm) -> số booking đang giữ
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            booking_id = next(booking_ids)
+            room_ids = rng.sample(rooms, args.rooms_per_booking)
+            checkin = start + timedelta(days=rng.randrange(3)) if args.overlap else start
+            checkout = checkin + timedelta(days=args.nights)
+            nights = [(rid, checkin + timedelta(days=d)) for rid in room_ids for d in range(args.nights)]
+
+            started = time.perf_counter()
+            ok = await acquire(stats, booking_id, room_ids, checkin, checkout)
+            timings.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                stats["failed"] += 1
+                continue
+
+            stats["ok"] += 1
+            if any(held_nights[n] for n in nights):
+                stats["double_held"] += 1
+            held_nights.update(nights)
+            await asyncio.sleep(args.hold_ms / 1000)
+            held_nights.subtract(nights)
+            await release(stats, booking_id, room_ids, checkin, checkout)
+
+    await asyncio.gather(*(worker() for _ in range(args.workers)))
+    attempts = stats["ok"] + stats["failed"]
+    report(
+        label,
+        timings,
+        f"ok={stats['ok']} failed={stats['failed']} ({stats['failed'] / max(attempts, 1):.0%}) "
+        f"round_trips={stats['round_trips']} double_held={stats['double_held']}",
+    )
+
+
+async def main(args) -> None:
+    await run("SET NX từng phòng (cũ)", legacy_acquire, legacy_release, args)
+    await run("script Lua nguyên tử", script_acquire, script_release, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--rooms-per-booking", type=int, default=3)
+    parser.add_argument("--nights", type=int, default=2)
+    parser.add_argument("--hold-ms", type=float, default=5)
+    parser.add_argument("--overlap", action="store_true", help="khoảng ngày ngẫu nhiên giao nhau")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--room-base", type=int, default=900_000_000)
+    asyncio.run(main(parser.parse_args()))
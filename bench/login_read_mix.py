@@ -0,0 +1,67 @@
+"""Tải trộn login + đọc property trên API đang chạy: read p99 có bị login (bcrypt) kéo xuống không.
+
+    uvicorn app.main:app --workers 1 &
+    python -m bench.login_read_mix --base-url http://localhost:8000 --property-id 1
+
+Pha 1 chỉ đọc GET /properties/{id}; pha 2 đọc cùng lúc với login liên tục của --users tài khoản
+(tạo qua /auth/register). 429/503 của login là do giới hạn concurrency/pool, được đếm riêng.
+Chạy lại trên commit trước khi tách bcrypt ra process pool để có số "before".
+"""
+import argparse
+import asyncio
+import uuid
+
+import httpx
+
+from bench._common import http_load, report
+
+PASSWORD = "bench-password-123"
+
+
+async def _register_users(client: httpx.AsyncClient, count: int) -> list:
+    run = uuid.uuid4().hex[:8]
+    emails = [f"bench-login-{run}-{i}@example.com" for i in range(count)]
+    for email in emails:
+        response = await client.post("/auth/register", json={
+            "email": email,
+            "password": PASSWORD,
+            "full_name": "Bench",
+        })
+        response.raise_for_status()
+    return emails
+
+
+async def main(args) -> None:
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        emails = await _register_users(client, args.users)
+
+        async def read(client, i):
+            return await client.get(f"/properties/{args.property_id}")
+
+        async def login(client, i):
+            return await client.post("/auth/login", data={
+                "username": emails[i % len(emails)],
+                "password": PASSWORD,
+            })
+
+        timings, statuses = await http_load(client, read, args.readers, args.seconds)
+        report("read only", timings, dict(statuses))
+
+        (read_timings, read_statuses), (login_timings, login_statuses) = await asyncio.gather(
+            http_load(client, read, args.readers, args.seconds),
+            http_load(client, login, args.logins, args.seconds),
+        )
+        report("read + login: read", read_timings, dict(read_statuses))
+        report("read + login: login", login_timings, dict(login_statuses))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--property-id", type=int, required=True)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--readers", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=20)
+    asyncio.run(main(parser.parse_args()))
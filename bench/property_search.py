@@ -0,0 +1,99 @@
+"""So sánh tìm property theo từ khóa: trigram/tsvector (search_properties) vs ILIKE cũ.
+
+    alembic upgrade head   # cần pg_trgm, unaccent và các index của migration search
+    python -m bench.property_search --properties 100000 -n 30
+
+Seed --properties property (tên/địa chỉ tiếng Việt có dấu, ghép ngẫu nhiên) vào DB cấu hình trong
+.env, ANALYZE, rồi chạy cùng bộ từ khóa qua hai đường:
+  - ILIKE cũ: name ILIKE '%kw%' OR address ILIKE '%kw%', trả hết kết quả, không xếp hạng
+  - search_properties: unaccent + tsvector/trigram, xếp theo độ liên quan, limit 20
+In p50/p95/p99 (ms) và số kết quả. Dữ liệu seed bị xóa khi xong (trừ khi --keep).
+"""
+import argparse
+import random
+import time
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.property import Property
+from app.repositories.property_search_repo import PropertySearchRepository
+from bench._common import cleanup, insert_ids, report, timed
+
+PREFIXES = ["Khách sạn", "Homestay", "Resort", "Nhà nghỉ", "Villa", "Căn hộ"]
+NAMES = ["Hoa Sen", "Biển Xanh", "Phương Đông", "Sài Gòn", "Hồ Tây", "Ngọc Lan", "Mường Thanh", "Thiên Đường", "Bình Minh", "Sông Hàn"]
+STREETS = ["Lê Lợi", "Trần Hưng Đạo", "Nguyễn Huệ", "Hai Bà Trưng", "Bạch Đằng", "Võ Nguyên Giáp"]
+CITIES = ["Hà Nội", "Đà Nẵng", "Hội An", "Nha Trang", "Đà Lạt", "Phú Quốc", "Huế", "Vũng Tàu"]
+
+# có dấu, không dấu, một phần từ, gõ sai
+KEYWORDS = ["Đà Lạt", "da lat", "hoa sen", "Biển", "muong thanh", "resort phu quoc", "Nguyễn Huệ", "thien duong", "son han", "villa"]
+
+
+def legacy_search(session: Session, keyword: str):
+    pattern = f"%{keyword}%"
+    statement = (
+        select(Property)
+        .where(Property.name.ilike(pattern) | Property.address.ilike(pattern))
+        .where(Property.is_active == True)
+    )
+    return session.exec(statement).all()
+
+
+def _seed(session: Session, count: int, rng: random.Random):
+    rows = [
+        {
+            "name": f"bench {rng.choice(PREFIXES)} {rng.choice(NAMES)} {i}",
+            "address": f"{rng.randint(1, 300)} {rng.choice(STREETS)}, {rng.choice(CITIES)}",
+            "is_active": True,
+        }
+        for i in range(count)
+    ]
+    started = time.perf_counter()
+    ids = insert_ids(session, Property, rows)
+    session.commit()
+    session.execute(text("ANALYZE property"))
+    session.commit()
+    print(f"seeded: {len(ids)} properties in {time.perf_counter() - started:.1f}s")
+    return ids
+
+
+def _measure(label: str, fn, keywords, iterations: int) -> None:
+    timings, found = [], {}
+    with Session(engine) as session:
+        for _ in range(iterations):
+            for keyword in keywords:
+                elapsed_ms, results = timed(fn, session, keyword)
+                timings.append(elapsed_ms)
+                found[keyword] = len(results)
+    report(label, timings)
+    print("    kết quả:", ", ".join(f"{k!r}={v}" for k, v in found.items()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=100_000)
+    parser.add_argument("-n", "--iterations", type=int, default=30, help="số vòng qua bộ từ khóa")
+    parser.add_argument("--keep", action="store_true", help="không xóa dữ liệu seed")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        property_ids = _seed(session, args.properties, random.Random(42))
+
+    try:
+        for label, fn in (
+            ("ILIKE (cũ)", legacy_search),
+            ("trigram/tsvector", PropertySearchRepository.search_properties),
+        ):
+            with Session(engine) as session:
+                for keyword in KEYWORDS:
+                    fn(session, keyword)
+            _measure(label, fn, KEYWORDS, args.iterations)
+    finally:
+        if not args.keep:
+            with Session(engine) as session:
+                cleanup(session, property_ids, [])
+
+
+if __name__ == "__main__":
+    main()
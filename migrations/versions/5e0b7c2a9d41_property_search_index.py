@@ -0,0 +1,60 @@
+"""property search index
+
+Revision ID: 5e0b7c2a9d41
+Revises: 66844ba0f224
+Create Date: 2026-10-17 09:12:40.512304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7c2a9d41'
+down_revision: Union[str, None] = '66844ba0f224'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Trigram + full-text index (bỏ dấu tiếng Việt) cho tìm kiếm property"""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() không IMMUTABLE nên không dùng trực tiếp trong index được
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        """
+    )
+
+    op.execute(
+        """
+        CREATE INDEX ix_property_name_trgm ON property
+        USING gin (f_unaccent(lower(name)) gin_trgm_ops)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX ix_property_address_trgm ON property
+        USING gin (f_unaccent(lower(coalesce(address, ''))) gin_trgm_ops)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX ix_property_search_document ON property
+        USING gin (to_tsvector('simple', f_unaccent(lower(coalesce(name, '') || ' ' || coalesce(address, '')))))
+        """
+    )
+
+
+def downgrade() -> None:
+    """Remove property search indexes"""
+    op.drop_index('ix_property_search_document', table_name='property')
+    op.drop_index('ix_property_address_trgm', table_name='property')
+    op.drop_index('ix_property_name_trgm', table_name='property')
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,44 @@
+"""property geo index
+
+Revision ID: 9a4d2f6c1b83
+Revises: 5e0b7c2a9d41
+Create Date: 2026-10-17 10:03:18.227915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d2f6c1b83'
+down_revision: Union[str, None] = '5e0b7c2a9d41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Spatial index (cube + earthdistance) cho tìm property theo bán kính / khung bản đồ"""
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance")
+
+    op.execute(
+        """
+        CREATE INDEX ix_property_earth ON property
+        USING gist (ll_to_earth(latitude, longitude))
+        WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+        """
+    )
+    op.create_index(
+        'ix_property_lat_lng',
+        'property',
+        ['latitude', 'longitude'],
+        postgresql_where=sa.text('latitude IS NOT NULL AND longitude IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Remove property geo indexes"""
+    op.drop_index('ix_property_lat_lng', table_name='property')
+    op.drop_index('ix_property_earth', table_name='property')
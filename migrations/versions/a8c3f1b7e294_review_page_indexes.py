@@ -0,0 +1,30 @@
+"""review page indexes
+
+Revision ID: a8c3f1b7e294
+Revises: f4b8d2e6a175
+Create Date: 2026-10-17 14:48:05.736120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3f1b7e294'
+down_revision: Union[str, None] = 'f4b8d2e6a175'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index cho keyset pagination review: newest (property_id, id), highest/lowest (property_id, rating, id)"""
+    op.create_index('ix_review_property_id_id', 'review', ['property_id', 'id'])
+    op.create_index('ix_review_property_id_rating_id', 'review', ['property_id', 'rating', 'id'])
+
+
+def downgrade() -> None:
+    """Remove review page indexes"""
+    op.drop_index('ix_review_property_id_rating_id', table_name='review')
+    op.drop_index('ix_review_property_id_id', table_name='review')
@@ -0,0 +1,43 @@
+"""booked room no overlap
+
+Revision ID: c3e8a1f5d720
+Revises: 9a4d2f6c1b83
+Create Date: 2026-10-17 11:20:41.508312
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8a1f5d720'
+down_revision: Union[str, None] = '9a4d2f6c1b83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Exclusion constraint (btree_gist): 1 phòng không có 2 khoảng ở giao nhau"""
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+
+    op.create_check_constraint(
+        'ck_booked_room_dates',
+        'booked_room',
+        sa.text('checkout > checkin'),
+    )
+    # GiST index của constraint cũng phục vụ truy vấn (room_id =, daterange &&) khi tìm phòng trống
+    op.execute(
+        """
+        ALTER TABLE booked_room
+        ADD CONSTRAINT ex_booked_room_no_overlap
+        EXCLUDE USING gist (room_id WITH =, daterange(checkin, checkout, '[)') WITH &&)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Remove booked room overlap constraints"""
+    op.execute("ALTER TABLE booked_room DROP CONSTRAINT ex_booked_room_no_overlap")
+    op.drop_constraint('ck_booked_room_dates', 'booked_room', type_='check')
@@ -0,0 +1,37 @@
+"""room type inventory
+
+Revision ID: d71b4e0a9c52
+Revises: c3e8a1f5d720
+Create Date: 2026-10-17 12:05:13.842761
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71b4e0a9c52'
+down_revision: Union[str, None] = 'c3e8a1f5d720'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Bảng inventory theo đêm cho từng loại phòng; chạy task reconcile_room_inventory để dựng dữ liệu"""
+    op.create_table(
+        'room_type_inventory',
+        sa.Column('room_type_id', sa.Integer(), nullable=False),
+        sa.Column('night', sa.Date(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('booked', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('held', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['room_type_id'], ['room_type.id']),
+        sa.PrimaryKeyConstraint('room_type_id', 'night'),
+    )
+
+
+def downgrade() -> None:
+    """Remove room type inventory"""
+    op.drop_table('room_type_inventory')
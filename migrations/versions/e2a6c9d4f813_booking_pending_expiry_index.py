@@ -0,0 +1,33 @@
+"""booking pending expiry index
+
+Revision ID: e2a6c9d4f813
+Revises: d71b4e0a9c52
+Create Date: 2026-10-17 13:02:47.119034
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a6c9d4f813'
+down_revision: Union[str, None] = 'd71b4e0a9c52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Partial index cho task dọn booking hết hạn: chỉ chứa booking pending, sắp theo expires_at"""
+    op.create_index(
+        'ix_booking_pending_expires_at',
+        'booking',
+        ['expires_at'],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Remove booking pending expiry index"""
+    op.drop_index('ix_booking_pending_expires_at', table_name='booking')
@@ -0,0 +1,54 @@
+"""property rating stats
+
+Revision ID: f4b8d2e6a175
+Revises: e2a6c9d4f813
+Create Date: 2026-10-17 14:11:36.402958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8d2e6a175'
+down_revision: Union[str, None] = 'e2a6c9d4f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Bảng tổng hợp rating theo property, dựng sẵn từ review hiện có"""
+    op.create_table(
+        'property_rating_stats',
+        sa.Column('property_id', sa.Integer(), nullable=False),
+        sa.Column('review_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_1', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_2', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_3', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_4', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count_5', sa.Integer(), nullable=False, server_default='0'),
+        sa.ForeignKeyConstraint(['property_id'], ['property.id']),
+        sa.PrimaryKeyConstraint('property_id'),
+    )
+    op.execute(
+        """
+        INSERT INTO property_rating_stats
+            (property_id, review_count, rating_sum, count_1, count_2, count_3, count_4, count_5)
+        SELECT property_id, count(*), sum(rating),
+               count(*) FILTER (WHERE rating = 1),
+               count(*) FILTER (WHERE rating = 2),
+               count(*) FILTER (WHERE rating = 3),
+               count(*) FILTER (WHERE rating = 4),
+               count(*) FILTER (WHERE rating = 5)
+        FROM review
+        GROUP BY property_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Remove property rating stats"""
+    op.drop_table('property_rating_stats')
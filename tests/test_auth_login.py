@@ -0,0 +1,64 @@
+from contextlib import asynccontextmanager
+
+import fakeredis.aioredis
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import User
+from app.services import auth_service as auth_module
+from app.utils import refresh_tokens
+
+
+@asynccontextmanager
+async def _no_limits(*limits):
+    yield
+
+
+async def _verify(password: str, hashed: str):
+    return password == hashed, None
+
+
+@pytest_asyncio.fixture
+async def session(monkeypatch):
+    monkeypatch.setattr(auth_module, "concurrency_slots_async", _no_limits)
+    monkeypatch.setattr(auth_module, "verify_and_update_password_async", _verify)
+    monkeypatch.setattr(refresh_tokens, "ar", fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all, tables=[User.__table__])
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+async def _add_user(session: AsyncSession, email: str, is_active: bool) -> User:
+    user = User(email=email, password_hash="secret", full_name="Guest", is_active=is_active)
+    session.add(user)
+    await session.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_login_issues_tokens_for_active_user(session):
+    await _add_user(session, "active@example.com", is_active=True)
+
+    result = await auth_module.AuthService().login(session, "active@example.com", "secret")
+
+    assert result["access_token"] and result["refresh_token"]
+
+
+@pytest.mark.asyncio
+async def test_login_rejects_inactive_user(session):
+    await _add_user(session, "inactive@example.com", is_active=False)
+
+    with pytest.raises(HTTPException) as exc:
+        await auth_module.AuthService().login(session, "inactive@example.com", "secret")
+
+    assert exc.value.status_code == 403
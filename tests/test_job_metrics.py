@@ -0,0 +1,45 @@
+import fakeredis
+import pytest
+
+from app.utils import redis_cache
+
+JOB = "cleanup_expired_bookings"
+
+
+@pytest.fixture(autouse=True)
+def redis_db(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_cache, "r", client)
+    return client
+
+
+def test_lags_are_bucketed_across_runs(redis_db):
+    redis_cache.record_job_run(JOB, 3, 0.01, lags=[0.05, 0.2, 0.3])
+    redis_cache.record_job_run(JOB, 2, 0.01, lags=[0.3, 400])
+
+    stats = redis_db.hgetall(f"metrics:job:{JOB}")
+    assert stats["lag_count"] == "5"
+    assert stats["lag_le_100"] == "1"
+    assert stats["lag_le_250"] == "1"
+    assert stats["lag_le_500"] == "2"
+    assert stats["lag_gt_300000"] == "1"
+    assert stats["last_max_lag_ms"] == "400000"
+
+
+def test_job_stats_reports_quantile_buckets(redis_db):
+    redis_cache.record_job_run(JOB, 100, 0.01, lags=[0.05] * 90 + [2] * 9 + [400])
+
+    stats = redis_cache.job_stats(JOB)
+
+    assert stats["lag_p50_le_ms"] == 100
+    assert stats["lag_p95_le_ms"] == 2500
+    assert stats["lag_p99_le_ms"] == 2500
+
+
+def test_run_without_lags_has_no_histogram(redis_db):
+    redis_cache.record_job_run("reconcile_room_inventory", 0, 0.01)
+
+    stats = redis_cache.job_stats("reconcile_room_inventory")
+
+    assert stats["runs"] == "1"
+    assert "lag_count" not in stats and "lag_p50_le_ms" not in stats
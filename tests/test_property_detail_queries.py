@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import Property, PropertyRatingStats, Review, Room, RoomType, User
+from app.services.property_service import PropertyService
+
+
+TABLES = [
+    User.__table__,
+    Property.__table__,
+    RoomType.__table__,
+    Room.__table__,
+    Review.__table__,
+    PropertyRatingStats.__table__,
+]
+
+
+async def _seed(session: AsyncSession, room_types: int, rooms_per_type: int = 3) -> int:
+    user = User(email="guest@example.com", password_hash="x", full_name="Guest")
+    prop = Property(name="Hotel")
+    session.add_all([user, prop])
+    await session.flush()
+
+    for i in range(room_types):
+        rt = RoomType(property_id=prop.id, name=f"Type {i}", price=100, max_occupancy=2)
+        session.add(rt)
+        await session.flush()
+        session.add_all(
+            Room(room_type_id=rt.id, name=f"{i}-{j}") for j in range(rooms_per_type)
+        )
+
+    session.add_all(
+        Review(property_id=prop.id, user_id=user.id, rating=5) for _ in range(10)
+    )
+    await session.commit()
+    return prop.id
+
+
+async def _count_detail_queries(room_types: int) -> int:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all, tables=TABLES)
+
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            property_id = await _seed(session, room_types)
+
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+
+        async with AsyncSession(engine) as session:
+            detail = await PropertyService.build_detail(session, property_id)
+
+        assert len(detail.room_types) == room_types
+        return len(statements)
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_detail_query_count_does_not_grow_with_room_types():
+    small = await _count_detail_queries(room_types=1)
+    large = await _count_detail_queries(room_types=20)
+
+    assert small == large
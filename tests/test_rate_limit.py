@@ -0,0 +1,44 @@
+import fakeredis.aioredis
+import pytest
+from fastapi import HTTPException
+
+from app.utils import rate_limit
+
+KEY = "auth:inflight:ip:1.2.3.4"
+
+
+@pytest.fixture(autouse=True)
+def redis_db(monkeypatch):
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(rate_limit, "ar", client)
+    monkeypatch.setattr(rate_limit, "_acquire", client.register_script(rate_limit._ACQUIRE_SCRIPT))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_rejects_over_limit_and_releases_own_slot(redis_db):
+    async with rate_limit.concurrency_slots_async((KEY, 1)):
+        with pytest.raises(HTTPException) as exc:
+            async with rate_limit.concurrency_slots_async((KEY, 1)):
+                pass
+        assert exc.value.status_code == 429
+
+    assert await redis_db.zcard(KEY) == 0
+
+
+@pytest.mark.asyncio
+async def test_leaked_slot_expires_while_key_stays_busy(redis_db):
+    # slot của process đã chết, hạn chót đã qua
+    await redis_db.zadd(KEY, {"dead": 1})
+    await redis_db.pexpire(KEY, 60_000)
+
+    async with rate_limit.concurrency_slots_async((KEY, 1)):
+        assert await redis_db.zscore(KEY, "dead") is None
+
+
+@pytest.mark.asyncio
+async def test_release_after_key_expired_does_not_recreate_it(redis_db):
+    async with rate_limit.concurrency_slots_async((KEY, 1)):
+        await redis_db.delete(KEY)
+
+    assert not await redis_db.exists(KEY)
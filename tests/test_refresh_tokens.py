@@ -0,0 +1,46 @@
+import time
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from app.utils import refresh_tokens, token_revocation
+
+
+@pytest.fixture(autouse=True)
+def redis_db(monkeypatch):
+    server = fakeredis.FakeServer()
+    sync = fakeredis.FakeRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(token_revocation, "r", sync)
+    monkeypatch.setattr(refresh_tokens, "r", sync)
+    monkeypatch.setattr(refresh_tokens, "ar", fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(refresh_tokens, "_rotate", sync.register_script(refresh_tokens._ROTATE_SCRIPT))
+    return sync
+
+
+@pytest.mark.asyncio
+async def test_rotate_rejects_family_after_revocation():
+    family, jti = await refresh_tokens.start_family_async(7, "staff", 3)
+    assert refresh_tokens.rotate(family, 7, jti, "j1")[2] == "staff"
+
+    # bị giáng quyền ở worker khác: token mới của family này không được mang role cũ
+    token_revocation.revoke_user_tokens(7)
+
+    assert refresh_tokens.rotate(family, 7, "j1", "j2") == refresh_tokens.FAMILY_REVOKED
+    assert refresh_tokens.rotate(family, 7, "j1", "j2") == refresh_tokens.FAMILY_MISSING
+
+
+@pytest.mark.asyncio
+async def test_rotate_accepts_family_started_after_revocation(redis_db):
+    redis_db.set(token_revocation.revocation_key(7), int(time.time()) - 60)
+    family, jti = await refresh_tokens.start_family_async(7, "customer", None)
+
+    assert refresh_tokens.rotate(family, 7, jti, "j1") == ("j1", 7, "customer", None)
+
+
+@pytest.mark.asyncio
+async def test_previous_jti_within_grace_gets_current_jti():
+    family, jti = await refresh_tokens.start_family_async(7, "customer", None)
+    refresh_tokens.rotate(family, 7, jti, "j1")
+
+    assert refresh_tokens.rotate(family, 7, jti, "j2")[0] == "j1"
@@ -0,0 +1,81 @@
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.utils.smtp_pool import SMTPPool
+
+
+class _Sink:
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope.content)
+        self.peers.add(session.peer)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Server:
+
+    def __init__(self):
+        self.handler = _Sink()
+        self.port = _free_port()
+        self.controller = None
+
+    def start(self):
+        self.controller = Controller(self.handler, hostname="127.0.0.1", port=self.port)
+        self.controller.start()
+
+    def stop(self):
+        self.controller.stop()
+
+
+@pytest.fixture
+def smtp_server():
+    server = _Server()
+    server.start()
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+def _pool(server: _Server) -> SMTPPool:
+    return SMTPPool(host="127.0.0.1", port=server.port)
+
+
+def test_reuses_one_connection_for_sequential_sends(smtp_server):
+    handler = smtp_server.handler
+    pool = _pool(smtp_server)
+
+    for i in range(3):
+        pool.send("from@example.com", "to@example.com", f"Subject: {i}\r\n\r\nbody")
+    pool.close_all()
+
+    assert len(handler.messages) == 3
+    assert len(handler.peers) == 1
+
+
+def test_reconnects_when_pooled_connection_was_closed(smtp_server):
+    handler = smtp_server.handler
+    pool = _pool(smtp_server)
+
+    pool.send("from@example.com", "to@example.com", "Subject: 1\r\n\r\nbody")
+    # restart server: kết nối đang nằm trong pool bị đóng từ phía server
+    smtp_server.stop()
+    smtp_server.start()
+
+    pool.send("from@example.com", "to@example.com", "Subject: 2\r\n\r\nbody")
+    pool.close_all()
+
+    assert len(handler.messages) == 2
+    assert len(handler.peers) == 2